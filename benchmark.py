@@ -16,7 +16,7 @@ def main(args: argparse.Namespace):
 
   for file in os.listdir(args.folder):
     if file.endswith(".qasm"):
-      cost = map_file(file, args.folder, args.output, coupling_map, 3, 2)
+      cost = map_file(file, args.folder, args.output, coupling_map, 3, 2, args.weight, args.focal, args.partial)
       results[file] = cost
       print(f"{file} done, cost: {cost}")
 
@@ -27,8 +27,8 @@ def main(args: argparse.Namespace):
       writer.writerow({ "filename": circuit, "cost": cost })
 
 
-def map_file(circuit_name: str, input_folder: str, output_folder: str, coupling_map: List[List[int]], checkpoint_offset: int, checkpoint_look_ahead: int) -> int:
-  info = map(f"{input_folder}/{circuit_name}", f"{output_folder}/{circuit_name}", coupling_map, checkpoint_offset, checkpoint_look_ahead)
+def map_file(circuit_name: str, input_folder: str, output_folder: str, coupling_map: List[List[int]], checkpoint_offset: int, checkpoint_look_ahead: int, weight: float = 1, focal: float = None, partial: float = None) -> int:
+  info = map(f"{input_folder}/{circuit_name}", f"{output_folder}/{circuit_name}", coupling_map, checkpoint_offset, checkpoint_look_ahead, weight=weight, focal=focal, partial=partial)
   return info.cost
 
 def setup_parser() -> argparse.ArgumentParser:
@@ -36,6 +36,9 @@ def setup_parser() -> argparse.ArgumentParser:
   parser.add_argument("folder", help="Benchmark folder")
   parser.add_argument("output", help="Output folder")
   parser.add_argument("--result", "-r", help="Result csv file name", default="results.csv")
+  parser.add_argument("--weight", help="Weight of the heuristic (weighted A*)", default=1, type=float)
+  parser.add_argument("--focal", help="Suboptimality bound of the focal search", default=None, type=float)
+  parser.add_argument("--partial", help="Threshold of the partial expansion", default=None, type=float)
   return parser
 
 
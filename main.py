@@ -1,14 +1,20 @@
 import argparse
 import time
 
+from mapper.device import MAPPINGS, Device
 from mapper.mapper import map
+from mapper.online import map_online
 from mapper.qasm.input import get_coupling_map
 
 
 def main(args: argparse.Namespace):
   start = time.time()
   coupling_map = get_coupling_map() # hardcoded, can of course be arbitrary
-  info = map(args.file, args.output, coupling_map, args.checkpoint_offset, args.checkpoint_look_ahead)
+  device = Device(coupling_map, args.large_device, args.mapping)
+  if args.online_window is not None:
+    info = map_online(args.file, args.output, device, args.checkpoint_offset, args.checkpoint_look_ahead, args.online_window, args.prune_look_ahead, args.weight, args.focal, args.partial)
+  else:
+    info = map(args.file, args.output, device, args.checkpoint_offset, args.checkpoint_look_ahead, args.prune_look_ahead, args.region_slack, args.weight, args.focal, args.partial, args.checkpoint_budget)
   end = time.time()
   if args.verbose:
     print(f"Succesfully mapped circuit {args.file}")
@@ -18,6 +24,8 @@ def main(args: argparse.Namespace):
     print(f"\t{info.initial_mapping}")
     print(f"Mapping took {(end - start):.3f}s")
     print(f"Circuit costs in total {info.cost}")
+    print(f"Search took {info.stats.expansions} expansions")
+    print(f"Branching factor {info.stats.branching_factor:.2f} (without pruning {info.stats.unpruned_branching_factor:.2f})")
 
 
 def setup_parser() -> argparse.ArgumentParser:
@@ -26,6 +34,15 @@ def setup_parser() -> argparse.ArgumentParser:
   parser.add_argument("--output", "-o", help="Output file", default="output.qasm")
   parser.add_argument("--checkpoint-offset", help="Offset of checkpoints", default=3, type=int)
   parser.add_argument("--checkpoint-look-ahead", help="Amount of checkpoints to look ahead", default=2, type=int)
+  parser.add_argument("--checkpoint-budget", help="Place checkpoints adaptively, after the given amount of CNOT gates", default=None, type=int)
+  parser.add_argument("--prune-look-ahead", help="Only generate swaps relevant to the front layer and the given amount of checkpoints", default=None, type=int)
+  parser.add_argument("--large-device", help="Compute distances on demand and use sparse mappings, for devices with 1000+ qubits", default=False, action="store_true")
+  parser.add_argument("--mapping", help="Mapping implementation used for the search", default=None, choices=MAPPINGS.keys())
+  parser.add_argument("--region-slack", help="Only search on a compact region of the device, with the given amount of spare qubits (relative to the circuit width)", default=None, type=float)
+  parser.add_argument("--weight", help="Weight of the heuristic (weighted A*)", default=1, type=float)
+  parser.add_argument("--focal", help="Expand the deepest state within (1 + focal) of the lowest estimated cost (focal search)", default=None, type=float)
+  parser.add_argument("--partial", help="Only generate successors within the given threshold of the estimated cost of their parent (partial expansion)", default=None, type=float)
+  parser.add_argument("--online-window", help="Map the circuit line by line, committing the given amount of checkpoints at once", default=None, type=int)
   parser.add_argument("--verbose", "-v", help="Print additional infos", default=False, action="store_true")
   return parser
 
@@ -33,4 +50,6 @@ def setup_parser() -> argparse.ArgumentParser:
 if __name__ == "__main__":
   parser = setup_parser()
   args = parser.parse_args()
+  if args.online_window is not None and (args.region_slack is not None or args.checkpoint_budget is not None):
+    parser.error("--online-window cannot be combined with --region-slack or --checkpoint-budget")
   main(args)
\ No newline at end of file
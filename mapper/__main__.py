@@ -0,0 +1,29 @@
+import argparse
+
+from mapper.qasm.input import get_coupling_map
+from mapper.server import serve
+
+
+def main(args: argparse.Namespace):
+  coupling_map = get_coupling_map() # hardcoded, can of course be arbitrary
+  serve(coupling_map, args.host, args.port, args.socket, args.workers, args.max_pending, args.timeout)
+
+
+def setup_parser() -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser(prog="python -m mapper")
+  commands = parser.add_subparsers(dest="command", required=True)
+
+  serve_parser = commands.add_parser("serve", help="Serve mapping requests from a pool of warm workers")
+  serve_parser.add_argument("--host", help="Host to listen on", default="127.0.0.1")
+  serve_parser.add_argument("--port", "-p", help="Port to listen on", default=8000, type=int)
+  serve_parser.add_argument("--socket", help="Listen on this unix socket instead of a port", default=None)
+  serve_parser.add_argument("--workers", "-w", help="Amount of worker processes, defaults to the cpu count", default=None, type=int)
+  serve_parser.add_argument("--max-pending", help="Maximal amount of queued or running jobs, defaults to 4 per worker", default=None, type=int)
+  serve_parser.add_argument("--timeout", "-t", help="Maximal time in seconds a single job may take", default=60, type=float)
+  return parser
+
+
+if __name__ == "__main__":
+  parser = setup_parser()
+  args = parser.parse_args()
+  main(args)
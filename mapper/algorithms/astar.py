@@ -1,16 +1,29 @@
+import heapq
 from queue import PriorityQueue
-from typing import Dict, Set
+from typing import Dict, List, Set, Tuple, Union
 
 import numpy as np
 
+from mapper.algorithms.stats import SearchStats
 from mapper.state.state import State
 
 
-def astar(initial_states: Set[State], costs: np.ndarray, neighbours: Dict[int, Set[int]], checkpoint_look_ahead: int) -> State:
+def astar(initial_states: Set[State], costs: np.ndarray, neighbours: Dict[int, Set[int]], checkpoint_look_ahead: int, prune_look_ahead: int = None, stats: SearchStats = None, weight: float = 1, focal: float = None, partial: float = None) -> State:
   """
     Performs the astar algorithm.
     Does not allow states to be processed, which have a shallower checkpoint than the current deepest checkpoint.
+    If prune_look_ahead is given, only relevant swaps are generated (see State::successors(...)).
+    The heuristic is multiplied by weight (weighted A*, f = g + weight * h).
+    If focal is given, a focal search is performed instead, see _focal_search(...).
+    If partial is given, the states are expanded partially, see _partial_expansion_search(...).
   """
+  if focal is not None and partial is not None:
+    raise ValueError("Focal search and partial expansion cannot be combined")
+  if focal is not None:
+    return _focal_search(initial_states, costs, neighbours, checkpoint_look_ahead, prune_look_ahead, stats, weight, focal)
+  if partial is not None:
+    return _partial_expansion_search(initial_states, costs, neighbours, checkpoint_look_ahead, prune_look_ahead, stats, weight, partial)
+
   pq = PriorityQueue()
   visited = set()
   checkpoint_depth = 0
@@ -32,9 +45,116 @@ def astar(initial_states: Set[State], costs: np.ndarray, neighbours: Dict[int, S
     if current.is_done():
       return current
 
-    for state in current.successors(costs, neighbours):
+    for state in current.successors(costs, neighbours, prune_look_ahead, stats):
       checkpoint_depth = max(checkpoint_depth, state.checkpoint.depth)
-      cost = state.total_cost(costs, checkpoint_look_ahead)
+      cost = state.total_cost(costs, checkpoint_look_ahead, weight)
       pq.put_nowait((cost, state, ))
 
   raise Exception("Failed to map circuit")
+
+
+def _focal_search(initial_states: Set[State], costs: np.ndarray, neighbours: Dict[int, Set[int]], checkpoint_look_ahead: int, prune_look_ahead: int, stats: SearchStats, weight: float, focal: float) -> State:
+  """
+    Performs a focal search. Among all open states, whose f value lies within (1 + focal) of the lowest
+    f value, the state with the deepest checkpoint (and then the lowest heuristic) is expanded.
+    The open states are kept in a heap ordered by f, the ones within the bound are moved into the focal heap.
+    As the heuristic is not admissible anyway, the bound only steers the search and is no guarantee.
+  """
+  open_states: List[Tuple[float, int, float, State]] = []
+  focal_states: List[Tuple[int, float, int, State]] = []
+  focal_f: List[Tuple[float, int]] = [] # f values of the focal states, to find the lowest f value
+  expanded = set()
+  visited = set()
+  checkpoint_depth = 0
+  counter = 0 # breaks ties between states without comparing them
+
+  for state in initial_states:
+    heapq.heappush(open_states, (0, counter, 0, state))
+    counter += 1
+
+  while open_states or focal_states:
+    while focal_f and focal_f[0][1] in expanded:
+      heapq.heappop(focal_f)
+
+    f_min = min(open_states[0][0] if open_states else float("inf"), focal_f[0][0] if focal_f else float("inf"))
+    bound = f_min * (1 + focal)
+    while open_states and open_states[0][0] <= bound:
+      f, index, h, state = heapq.heappop(open_states)
+      heapq.heappush(focal_states, (-state.checkpoint.depth, h, index, state))
+      heapq.heappush(focal_f, (f, index))
+
+    if not focal_states:
+      break
+    _, _, index, current = heapq.heappop(focal_states)
+    expanded.add(index)
+
+    if current in visited:
+      continue
+
+    if current.checkpoint.depth < checkpoint_depth:
+      continue
+
+    visited.add(current)
+
+    if current.is_done():
+      return current
+
+    for state in current.successors(costs, neighbours, prune_look_ahead, stats):
+      checkpoint_depth = max(checkpoint_depth, state.checkpoint.depth)
+      h = state.heuristic(costs, checkpoint_look_ahead)
+      heapq.heappush(open_states, (state.cost + weight * h, counter, h, state))
+      counter += 1
+
+  raise Exception("Failed to map circuit")
+
+
+def _partial_expansion_search(initial_states: Set[State], costs: np.ndarray, neighbours: Dict[int, Set[int]], checkpoint_look_ahead: int, prune_look_ahead: int, stats: SearchStats, weight: float, threshold: float) -> State:
+  """
+    Performs a partial expansion astar. Expanding a state only computes the cost of its swaps (see State::expansion(...)),
+    but generates just the successors, whose cost lies within threshold of the cost of the expanded state.
+    The remaining candidates are kept with the state, which is queued again with the cost of its best candidate.
+  """
+  pq = PriorityQueue()
+  visited = set()
+  pending: Dict[int, Tuple[State, List[Tuple[float, int, Union[State, Tuple[int, int]]]]]] = {} # id of a queued state -> its origin and its remaining candidates
+  checkpoint_depth = 0
+  for state in initial_states:
+    pq.put_nowait((0, state, ))
+
+  while not pq.empty():
+    cost, current = pq.get_nowait()
+    expansion = pending.pop(id(current), None)
+
+    if expansion is None:
+      if current in visited or current.checkpoint.depth < checkpoint_depth:
+        continue
+
+      visited.add(current)
+
+      if current.is_done():
+        return current
+
+      origin, successors, edges = current.expansion(costs, neighbours, prune_look_ahead, stats)
+      # as in astar(...), the deepest checkpoint accounts for all successors, not only the generated ones
+      checkpoint_depth = max([checkpoint_depth, origin.checkpoint.depth] + [state.checkpoint.depth for state in successors])
+      candidates = [(state.total_cost(costs, checkpoint_look_ahead, weight), index, state) for index, state in enumerate(successors)]
+      for index, (total_cost, p, pn) in enumerate(origin.swap_costs(edges, costs, checkpoint_look_ahead, weight), len(candidates)):
+        candidates.append((total_cost, index, (p, pn)))
+      # sorted descending, so the best candidate can be popped from the end
+      candidates.sort(key=lambda candidate: (candidate[0], candidate[1]), reverse=True)
+    else:
+      origin, candidates = expansion
+      if origin.checkpoint.depth < checkpoint_depth:
+        continue
+
+    while candidates and candidates[-1][0] <= cost + threshold:
+      total_cost, _, candidate = candidates.pop()
+      state = candidate if isinstance(candidate, State) else origin.generate_swap(*candidate)
+      if state.checkpoint.depth >= checkpoint_depth:
+        pq.put_nowait((total_cost, state, ))
+
+    if candidates:
+      pending[id(current)] = (origin, candidates)
+      pq.put_nowait((candidates[-1][0], current, ))
+
+  raise Exception("Failed to map circuit")
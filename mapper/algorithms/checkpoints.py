@@ -1,20 +1,32 @@
-from typing import Set
+from bisect import bisect_right
+from typing import Callable, List, Set, Tuple
 from queue import PriorityQueue
 
 from mapper.gate.gate import Gate
 from mapper.gate.checkpoint import Checkpoint
+from mapper.gate.type import Type
 
 
-def add_checkpoints(working_set: Set[Gate], checkpoint_offset: int) -> Gate:
+def add_checkpoints(working_set: Set[Gate], checkpoint_offset: int, checkpoint_budget: int = None) -> Gate:
   """
     Adds checkpoint gates every checkpoint_depth depth level.
-    They are used to break the circuit into manageable parts
+    They are used to break the circuit into manageable parts.
+    If checkpoint_budget is given, the checkpoints are placed adaptively instead,
+    such that each part contains (at least) checkpoint_budget CNOT gates, see _segment_boundaries(...).
   """
+  if checkpoint_budget is not None and checkpoint_budget < 1:
+    raise ValueError("The checkpoint budget has to be at least 1 CNOT gate")
+
   pq = PriorityQueue()
   checkpoints = dict()
   visited = set()
 
-  checkpoint: Checkpoint = checkpoints.setdefault(0, Checkpoint())
+  if checkpoint_budget is None:
+    segment = lambda depth: ((depth // checkpoint_offset) * checkpoint_offset, ((depth // checkpoint_offset) + 1) * checkpoint_offset)
+  else:
+    segment = _adaptive_segment(_segment_boundaries(working_set, checkpoint_budget))
+
+  checkpoint: Checkpoint = checkpoints.setdefault(0, Checkpoint(checkpoint_budget))
 
   for gate in working_set:
     checkpoint.children.add(gate)
@@ -30,23 +42,24 @@ def add_checkpoints(working_set: Set[Gate], checkpoint_offset: int) -> Gate:
 
     visited.add(current)   
 
-    next_checkpoint_depth = ((current.depth // checkpoint_offset) + 1) * checkpoint_offset
-    prev_checkpoint_depth = (current.depth // checkpoint_offset) * checkpoint_offset
+    prev_checkpoint_depth, next_checkpoint_depth = segment(current.depth)
 
-    checkpoint: Checkpoint = checkpoints.setdefault(next_checkpoint_depth, Checkpoint())
-    prev_cp: Checkpoint = checkpoints.setdefault(prev_checkpoint_depth, Checkpoint())
+    checkpoint: Checkpoint = checkpoints.setdefault(next_checkpoint_depth, Checkpoint(checkpoint_budget))
+    prev_cp: Checkpoint = checkpoints.setdefault(prev_checkpoint_depth, Checkpoint(checkpoint_budget))
     
     prev_cp.next = checkpoint
     checkpoint.prev = prev_cp
     checkpoint.depth = next_checkpoint_depth
     prev_cp.gates.add(current)
+    if current.type == Type.CNOT:
+      prev_cp.cnots += 1
 
     n_children = set()
     for child in current.children:
       pq.put_nowait((child.depth, child, ))
       if child.depth >= next_checkpoint_depth:
-        cp_depth = ((child.depth // checkpoint_offset)) * checkpoint_offset
-        cp: Checkpoint = checkpoints.setdefault(cp_depth, Checkpoint())
+        cp_depth, _ = segment(child.depth)
+        cp: Checkpoint = checkpoints.setdefault(cp_depth, Checkpoint(checkpoint_budget))
         cp.depth = cp_depth
         cp.children.add(child)
 
@@ -68,3 +81,45 @@ def add_checkpoints(working_set: Set[Gate], checkpoint_offset: int) -> Gate:
   last_cp.done = True
   
   return checkpoints[0]
+
+
+def _segment_boundaries(working_set: Set[Gate], checkpoint_budget: int) -> List[int]:
+  """
+    Returns the (sorted) depths at which a checkpoint is placed, such that each part of the circuit
+    contains at least checkpoint_budget CNOT gates (except for the last one).
+    A depth level is never split, so dense levels may exceed the budget, while
+    stretches of single qubit gates are merged into the next part.
+  """
+  cnots = dict()
+  visited = set()
+  stack = list(working_set)
+  while stack:
+    gate = stack.pop()
+    if gate in visited:
+      continue
+    visited.add(gate)
+    cnots[gate.depth] = cnots.get(gate.depth, 0) + (gate.type == Type.CNOT)
+    stack.extend(gate.children)
+
+  boundaries = [0]
+  budget = 0
+  max_depth = max(cnots.keys(), default=0)
+  for depth in range(max_depth + 1):
+    budget += cnots.get(depth, 0)
+    if budget >= checkpoint_budget:
+      boundaries.append(depth + 1)
+      budget = 0
+
+  if boundaries[-1] <= max_depth:
+    boundaries.append(max_depth + 1)
+  return boundaries
+
+
+def _adaptive_segment(boundaries: List[int]) -> Callable[[int], Tuple[int, int]]:
+  """
+    Returns a function, which maps a depth to the depths of the checkpoints before and after it.
+  """
+  def segment(depth: int) -> Tuple[int, int]:
+    index = bisect_right(boundaries, depth) - 1
+    return boundaries[index], boundaries[index + 1]
+  return segment
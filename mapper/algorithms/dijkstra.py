@@ -1,6 +1,7 @@
-from typing import List
+from typing import Dict, List, Tuple
 
-from scipy.sparse.csgraph import dijkstra as dijkstra_scipy
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as dijkstra_scipy, shortest_path
 import numpy as np
 
 
@@ -11,12 +12,45 @@ def dijkstra(coupling_map: List[List[int]], vertex_count: int) -> np.ndarray:
   return dijkstra_scipy(_coupling_map_to_graph_matrix(coupling_map, vertex_count), directed=False)
 
 
-def _coupling_map_to_graph_matrix(coupling_map: List[List[int]], vertex_count: int) -> np.ndarray:
+class LazyDistances:
   """
-    Converts the coupling map into a graph.
+    Distances between the qubits of a coupling map, which are computed (using a bfs)
+    only for the qubits which are actually queried and cached afterwards.
+    Can be indexed like the matrix returned by dijkstra(...), but needs only
+    O(vertex_count) memory per queried qubit.
+    Unreachable qubits have the distance LazyDistances.UNREACHABLE.
   """
-  matrix = np.zeros(shape=(vertex_count, vertex_count))
-  for edge in coupling_map:
-    matrix[edge[0], edge[1]] = 1
-  return matrix
+  UNREACHABLE = np.iinfo(np.int16).max
 
+  def __init__(self, coupling_map: List[List[int]], vertex_count: int):
+    self._graph = _coupling_map_to_graph_matrix(coupling_map, vertex_count)
+    self._rows: Dict[int, np.ndarray] = {}
+
+
+  def row(self, p: int) -> np.ndarray:
+    """
+      Returns the distances of the physical qubit p to all other qubits.
+    """
+    row = self._rows.get(p)
+    if row is None:
+      row = shortest_path(self._graph, directed=False, unweighted=True, indices=p)
+      # casting inf (unreachable qubits) to int16 is undefined, so they get the largest distance instead
+      row[np.isinf(row)] = LazyDistances.UNREACHABLE
+      row = row.astype(np.int16)
+      self._rows[p] = row
+    return row
+
+
+  def __getitem__(self, qubits: Tuple[int, int]) -> int:
+    p1, p2 = qubits
+    return self.row(p1)[p2]
+
+
+def _coupling_map_to_graph_matrix(coupling_map: List[List[int]], vertex_count: int) -> csr_matrix:
+  """
+    Converts the coupling map into a (sparse) graph.
+  """
+  edges = { (edge[0], edge[1]) for edge in coupling_map }
+  rows = [edge[0] for edge in edges]
+  columns = [edge[1] for edge in edges]
+  return csr_matrix((np.ones(len(edges)), (rows, columns)), shape=(vertex_count, vertex_count))
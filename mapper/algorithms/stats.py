@@ -0,0 +1,55 @@
+from typing import Dict
+
+
+class SearchStats:
+  """
+    Collected counters of one search pass.
+  """
+  def __init__(self):
+    self.expansions = 0
+    self.unpruned_successors = 0
+    self.successors = 0
+
+
+  def record_expansion(self, unpruned_successors: int, successors: int):
+    """
+      Records a single expansion, with the amount of successors before and after pruning.
+    """
+    self.expansions += 1
+    self.unpruned_successors += unpruned_successors
+    self.successors += successors
+
+
+  @property
+  def unpruned_branching_factor(self) -> float:
+    """
+      The average amount of successors per expansion, if no swaps would have been pruned.
+    """
+    if self.expansions == 0:
+      return 0
+    return self.unpruned_successors / self.expansions
+
+
+  @property
+  def branching_factor(self) -> float:
+    """
+      The average amount of successors per expansion.
+    """
+    if self.expansions == 0:
+      return 0
+    return self.successors / self.expansions
+
+
+  def to_dict(self) -> Dict:
+    """
+      Returns a json serializable representation of these stats.
+    """
+    return {
+      "expansions": self.expansions,
+      "branching_factor": self.branching_factor,
+      "unpruned_branching_factor": self.unpruned_branching_factor,
+    }
+
+
+  def __repr__(self) -> str:
+    return f"expansions: {self.expansions}, branching_factor: {self.branching_factor:.2f} (unpruned: {self.unpruned_branching_factor:.2f})"
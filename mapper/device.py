@@ -0,0 +1,140 @@
+import math
+from collections import deque
+from typing import Dict, List, Set, Tuple, Union
+
+import numpy as np
+
+from mapper.algorithms.dijkstra import LazyDistances, dijkstra
+from mapper.gate.gate import Gate
+from mapper.gate.type import Type
+from mapper.qasm.input import get_neighbours
+from mapper.state.mapping import Mapping
+from mapper.state.sparse_mapping import SparseMapping
+from mapper.state.zobrist_mapping import ZobristMapping
+
+
+MAPPINGS = {
+  "dense": Mapping,
+  "sparse": SparseMapping,
+  "zobrist": ZobristMapping,
+}
+
+
+class Device:
+  """
+    A coupling map together with the tables derived from it.
+    Can be shared between several mappings onto the same architecture.
+    For large devices (1000+ qubits) the distances are computed on demand
+    and the search uses sparse mappings, instead of dense qubit_count sized tables.
+    The mapping implementation used for the search can also be chosen explicitly, see MAPPINGS.
+  """
+  def __init__(self, coupling_map: List[List[int]], large: bool = False, mapping: str = None):
+    if mapping is None:
+      mapping = "sparse" if large else "dense"
+    if mapping not in MAPPINGS:
+      raise ValueError(f"Unknown mapping: {mapping}")
+
+    self.coupling_map = coupling_map
+    self.large = large
+    self.mapping = mapping
+    self.neighbours = get_neighbours(coupling_map)
+    self.qubit_count = len(self.neighbours)
+    self._regions: Dict[int, "Region"] = {}
+    if large:
+      self.costs = LazyDistances(coupling_map, self.qubit_count)
+    else:
+      self.costs = dijkstra(coupling_map, self.qubit_count)
+
+
+  def create_mapping(self) -> Union[Mapping, SparseMapping, ZobristMapping]:
+    """
+      Returns the identity mapping used for the search.
+    """
+    return MAPPINGS[self.mapping](self.qubit_count)
+
+
+  def region(self, width: int, slack: float = 0) -> Union["Device", "Region"]:
+    """
+      Returns a compact connected region of this device, which offers room for a circuit
+      using width qubits plus the given slack (relative to width).
+      The regions are cached per size, if the region would span the whole device, the device itself is returned.
+    """
+    size = max(2, math.ceil(width * (1 + slack)))
+    if size >= self.qubit_count:
+      return self
+
+    region = self._regions.get(size)
+    if region is None:
+      region = Region(self, _select_region(self.neighbours, size))
+      self._regions[size] = region
+    return region
+
+
+  def __repr__(self) -> str:
+    return f"Device with {self.qubit_count} qubits"
+
+
+class Region(Device):
+  """
+    A connected part of a Device, whose qubits are renumbered starting at 0.
+    The i-th qubit of the region is the physical[i]-th qubit of the device.
+    The search only works on the (much smaller) tables of the region, its results are translated
+    back to the qubits of the device with Region::to_device(...).
+  """
+  def __init__(self, device: Device, qubits: List[int]):
+    self.device = device
+    self.physical = sorted(qubits)
+    index = { p: i for i, p in enumerate(self.physical) }
+    coupling_map = [[index[p1], index[p2]] for p1, p2 in device.coupling_map if p1 in index and p2 in index]
+    super().__init__(coupling_map, False, device.mapping)
+
+
+  def to_device(self, gates: List[Gate], initial_mapping: Mapping) -> Tuple[List[Gate], Mapping]:
+    """
+      Translates the mapped gates (inplace) and the initial mapping from the qubits of the region
+      to the qubits of the device. Logical qubits outside of the region are mapped to the remaining
+      physical qubits in ascending order.
+    """
+    physical = self.physical
+    for gate in gates:
+      gate.q1 = physical[gate.q1]
+      if gate.type == Type.CNOT or gate.type == Type.SWAP:
+        gate.q2 = physical[gate.q2]
+      elif gate.type == Type.BARRIER:
+        gate.q2 = [physical[q] for q in gate.q2]
+
+    inside = set(physical)
+    logical_to_physical = [physical[p] for p in initial_mapping._logical_to_physical]
+    logical_to_physical.extend(p for p in range(self.device.qubit_count) if p not in inside)
+    return gates, Mapping(self.device.qubit_count, np.array(logical_to_physical))
+
+
+  def __repr__(self) -> str:
+    return f"Region with {self.qubit_count} qubits of {self.device}"
+
+
+def _select_region(neighbours: Dict[int, Set[int]], size: int) -> List[int]:
+  """
+    Grows a region of the given size around every qubit (using a bfs), returning the most compact one,
+    i.e. the one with the lowest sum of distances to the qubit it was grown from.
+  """
+  best, best_score = None, None
+  for start in sorted(neighbours):
+    region = { start: 0 }
+    queue = deque([start])
+    while queue and len(region) < size:
+      p = queue.popleft()
+      for pn in sorted(neighbours[p]):
+        if pn not in region and len(region) < size:
+          region[pn] = region[p] + 1
+          queue.append(pn)
+
+    if len(region) < size:
+      continue # the component of start is too small
+    score = sum(region.values())
+    if best_score is None or score < best_score:
+      best, best_score = list(region), score
+
+  if best is None:
+    raise ValueError(f"The device has no connected region with {size} qubits")
+  return best
@@ -10,11 +10,14 @@ from mapper.state.mapping import Mapping
 class Checkpoint(Gate):
   """
     Checkpoint gates segement the circuit into smaller parts.
+    If the checkpoints are placed adaptively, budget holds the amount of CNOT gates per part.
   """
 
-  def __init__(self):
+  def __init__(self, budget: int = None):
     super().__init__(Type.CHECKPOINT, set(), set(), -1)
     self.gates = set()
+    self.cnots = 0
+    self.budget = budget
     self.prev: Checkpoint = None
     self.next: Checkpoint = None
     self.done = False
@@ -31,13 +34,23 @@ class Checkpoint(Gate):
   def gates_to_consider(self, look_ahead: int) -> Set[Gate]:
     """
       Returns the gates, which should be considered for the heuristic.
+      Without a budget, the gates of the next look_ahead parts are returned, otherwise
+      parts are added until they contain look_ahead * budget CNOT gates.
     """
     gates = set()
     cp = self
-    i = 0
-    while cp and i < look_ahead:
+    if self.budget is None:
+      i = 0
+      while cp and i < look_ahead:
+        gates.update(cp.gates)
+        i += 1
+        cp = cp.next
+      return gates
+
+    cnots = 0
+    while cp and cnots < look_ahead * self.budget:
       gates.update(cp.gates)
-      i += 1
+      cnots += cp.cnots
       cp = cp.next
     return gates
 
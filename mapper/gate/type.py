@@ -30,3 +30,10 @@ class Type(Enum):
     elif name == "checkpoint": return Type.CHECKPOINT
     else: raise ValueError(f"Encountered unknown name: {name}")
 
+
+
+  def __reduce_ex__(self, protocol):
+    """
+      Pickles the type by its name, as the (name, cost) value cannot be looked up by Enum
+    """
+    return Type.from_name, (self.value, )
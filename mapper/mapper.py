@@ -1,40 +1,143 @@
-from typing import List
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Set, Tuple, Union
+
+from qiskit import ClassicalRegister, QuantumCircuit
 
 from mapper.algorithms.astar import astar
 from mapper.algorithms.checkpoints import add_checkpoints
-from mapper.algorithms.dijkstra import dijkstra
-from mapper.qasm.input import get_neighbours, read_gates
+from mapper.algorithms.stats import SearchStats
+from mapper.device import Device, Region
+from mapper.gate.gate import Gate
+from mapper.gate.type import Type
+from mapper.qasm.input import ParsedCircuit, read_circuit, read_gates, read_qasm
 from mapper.qasm.mapping_info import MappingInfo
-from mapper.qasm.output import create_mapping_comment, state_to_circuit
+from mapper.qasm.output import circuit_to_qasm, state_to_circuit
 from mapper.state.mapping import Mapping
 from mapper.state.state import State
 
 
-def map(input_file: str, output_file: str, coupling_map: List[List[int]], checkpoint_offset: int = 3, checkpoint_look_ahead: int = 2) -> MappingInfo:
+Circuit = Union[str, QuantumCircuit, ParsedCircuit, Tuple[Set[Gate], List[Gate], List[ClassicalRegister]]]
+
+
+def map(input_file: str, output_file: str, coupling_map: Union[List[List[int]], Device], checkpoint_offset: int = 3, checkpoint_look_ahead: int = 2, prune_look_ahead: int = None, region_slack: float = None, weight: float = 1, focal: float = None, partial: float = None, checkpoint_budget: int = None) -> MappingInfo:
   """
     Maps the circuit given in input_file to the architecture specified by the coupling_map.
     Writes the mapped circuit into the output_file, with a comment at the end which
     specifies the initial mapping of the logical to the physical qubits.
+    If prune_look_ahead is given, only swaps which bring a gate of the front layer or of
+    the next prune_look_ahead checkpoints closer together are considered.
+    If checkpoint_budget is given, a checkpoint is placed after every checkpoint_budget CNOT gates
+    instead of every checkpoint_offset depth levels, and the look ahead follows the same budget.
+    Instead of a coupling_map, an already set up Device can be passed.
   """
-  working_set, gates, cregs = read_gates(input_file)
-  checkpoint = add_checkpoints(working_set, checkpoint_offset)
+  qc, info = map_circuit(read_gates(input_file), coupling_map, checkpoint_offset, checkpoint_look_ahead, prune_look_ahead, region_slack, weight, focal, partial, checkpoint_budget)
+
+  with open(output_file, "w") as f:
+    f.write(circuit_to_qasm(qc, info.initial_mapping))
 
-  neighbours = get_neighbours(coupling_map)
-  qubit_count = len(neighbours)
-  costs = dijkstra(coupling_map, qubit_count)
+  return info
+
+
+def map_qasm(qasm: str, coupling_map: Union[List[List[int]], Device], checkpoint_offset: int = 3, checkpoint_look_ahead: int = 2, prune_look_ahead: int = None, region_slack: float = None, weight: float = 1, focal: float = None, partial: float = None, checkpoint_budget: int = None) -> Tuple[str, MappingInfo]:
+  """
+    Maps the circuit given as qasm text, see map(...).
+    Returns the mapped circuit as qasm text, including the comment for the initial mapping.
+  """
+  qc, info = map_circuit(qasm, coupling_map, checkpoint_offset, checkpoint_look_ahead, prune_look_ahead, region_slack, weight, focal, partial, checkpoint_budget)
+  return circuit_to_qasm(qc, info.initial_mapping), info
+
+
+def map_circuit(circuit: Circuit, coupling_map: Union[List[List[int]], Device], checkpoint_offset: int = 3, checkpoint_look_ahead: int = 2, prune_look_ahead: int = None, region_slack: float = None, weight: float = 1, focal: float = None, partial: float = None, checkpoint_budget: int = None) -> Tuple[QuantumCircuit, MappingInfo]:
+  """
+    Maps the circuit, given either as qasm text, as qiskit QuantumCircuit, as ParsedCircuit or
+    as gates parsed by mapper.qasm.input.read_gates(...), see map(...).
+    A ParsedCircuit is left untouched, so it can be mapped again with other parameters or devices.
+    Returns the mapped QuantumCircuit without touching the file system.
+  """
+  if isinstance(circuit, str):
+    working_set, gates, cregs = read_qasm(circuit)
+  elif isinstance(circuit, QuantumCircuit):
+    working_set, gates, cregs = read_circuit(circuit)
+  elif isinstance(circuit, ParsedCircuit):
+    working_set, gates, cregs = circuit.gates()
+  else:
+    working_set, gates, cregs = circuit
+
+  checkpoint = add_checkpoints(working_set, checkpoint_offset, checkpoint_budget)
+
+  device = coupling_map if isinstance(coupling_map, Device) else Device(coupling_map)
+  if region_slack is not None:
+    device = device.region(_circuit_width(gates), region_slack)
   remaining_cost = sum(g.cost() for g in gates)
 
   # atm no initial mapping is computed, this could improve the performace drastically
-  mapping = Mapping(qubit_count)
-  state = State({ checkpoint }, set(), mapping, 0, remaining_cost, None, None, set(), checkpoint)
+  mapping = Mapping(device.qubit_count)
+  state = State({ checkpoint }, set(), device.create_mapping(), 0, remaining_cost, None, None, set(), checkpoint)
+
+  stats = SearchStats()
+  result = astar({ state }, device.costs, device.neighbours, checkpoint_look_ahead, prune_look_ahead, stats, weight, focal, partial)
 
-  result = astar({ state }, costs, neighbours, checkpoint_look_ahead)
+  region = device if isinstance(device, Region) else None
+  qc, initial_mapping, swaps, free_swaps = state_to_circuit(result, cregs, mapping, region)
+  return qc, MappingInfo(swaps, free_swaps, result.cost, initial_mapping, stats)
 
-  qc, initial_mapping, swaps, free_swaps = state_to_circuit(result, cregs, mapping)
-  comment = create_mapping_comment(initial_mapping)
 
-  qc.qasm(filename=output_file)
-  with open(output_file, "a") as f:
-    f.write(comment + "\n")
+def map_many(circuits: Iterable[Union[str, QuantumCircuit, ParsedCircuit]], coupling_map: Union[List[List[int]], Device], checkpoint_offset: int = 3, checkpoint_look_ahead: int = 2, prune_look_ahead: int = None, region_slack: float = None, weight: float = 1, focal: float = None, partial: float = None, checkpoint_budget: int = None, processes: int = None) -> Iterator[Tuple[int, str, MappingInfo]]:
+  """
+    Maps a batch of circuits, given as qasm texts, qiskit QuantumCircuits or ParsedCircuits, onto the same device.
+    The device tables are set up once for the whole batch.
+    Yields the index of the circuit in the batch together with the mapped qasm text and its info.
+    If processes is given, the circuits are mapped in parallel and yielded as soon as they are done,
+    otherwise they are mapped one after another, in order.
+  """
+  device = coupling_map if isinstance(coupling_map, Device) else Device(coupling_map)
+  parameters = (checkpoint_offset, checkpoint_look_ahead, prune_look_ahead, region_slack, weight, focal, partial, checkpoint_budget)
+
+  if processes is None or processes <= 1:
+    for index, circuit in enumerate(circuits):
+      qc, info = map_circuit(circuit, device, *parameters)
+      yield index, circuit_to_qasm(qc, info.initial_mapping), info
+    return
+
+  executor = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(device, ))
+  futures = {}
+  try:
+    futures = { executor.submit(_map_job, circuit, parameters): index for index, circuit in enumerate(circuits) }
+    for future in as_completed(futures):
+      qasm, info = future.result()
+      yield futures[future], qasm, info
+  finally:
+    # Executor.shutdown(cancel_futures=True) requires python 3.9
+    for future in futures:
+      future.cancel()
+    executor.shutdown()
 
-  return MappingInfo(swaps, free_swaps, result.cost, initial_mapping)
+
+_worker_device: Device = None
+
+
+def _init_worker(device: Device):
+  """
+    Stores the device of the batch once per worker process.
+  """
+  global _worker_device
+  _worker_device = device
+
+
+def _map_job(circuit: Union[str, QuantumCircuit, ParsedCircuit], parameters: Tuple[int, int, int, float, float, float, float, int]) -> Tuple[str, MappingInfo]:
+  qc, info = map_circuit(circuit, _worker_device, *parameters)
+  return circuit_to_qasm(qc, info.initial_mapping), info
+
+
+def _circuit_width(gates: List[Gate]) -> int:
+  """
+    Returns the number of logical qubits the gates operate on.
+  """
+  width = 0
+  for gate in gates:
+    width = max(width, gate.q1 + 1)
+    if gate.type == Type.CNOT or gate.type == Type.SWAP:
+      width = max(width, gate.q2 + 1)
+    elif gate.type == Type.BARRIER:
+      width = max(width, *(q + 1 for q in gate.q2))
+  return width
@@ -0,0 +1,198 @@
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from mapper.algorithms.astar import astar
+from mapper.algorithms.checkpoints import add_checkpoints
+from mapper.algorithms.stats import SearchStats
+from mapper.device import Device
+from mapper.gate.checkpoint import Checkpoint
+from mapper.gate.gate import Gate
+from mapper.gate.type import Type
+from mapper.qasm.input import DagBuilder, QasmLineReader
+from mapper.qasm.mapping_info import MappingInfo
+from mapper.qasm.output import _backpropagate_free_swaps, _resolve_state, create_mapping_comment, gate_to_qasm
+from mapper.state.mapping import Mapping
+from mapper.state.state import State
+
+
+class OnlineMapper:
+  """
+    Maps a circuit while it is still being produced, gate by gate (or qasm line by qasm line).
+
+    The gates are buffered until they span window + checkpoint_look_ahead checkpoints.
+    The buffered gates are then mapped, but only the gates up to the window-th checkpoint
+    are committed and returned, the others are mapped again together with the following gates.
+    Latency to the first output and memory therefore do not depend on the length of the circuit.
+
+    Free swaps are only allowed on qubits, which have not been used by any committed gate,
+    so the initial mapping of already committed gates never changes.
+  """
+  def __init__(self, coupling_map: Union[List[List[int]], Device], checkpoint_offset: int = 3, checkpoint_look_ahead: int = 2, window: int = 2, prune_look_ahead: int = None, weight: float = 1, focal: float = None, partial: float = None):
+    if window < 1:
+      raise ValueError("At least 1 checkpoint has to be committed per window")
+
+    self.device = coupling_map if isinstance(coupling_map, Device) else Device(coupling_map)
+    self.checkpoint_offset = checkpoint_offset
+    self.checkpoint_look_ahead = checkpoint_look_ahead
+    self.window = window
+    self.prune_look_ahead = prune_look_ahead
+    self.weight = weight
+    self.focal = focal
+    self.partial = partial
+
+    self.initial_mapping = Mapping(self.device.qubit_count)
+    self.stats = SearchStats()
+    self.cost = 0
+    self.swaps = 0
+    self.free_swaps = 0
+
+    self._reader = QasmLineReader()
+    self._clbit_count = 0
+    self._mapping = self.device.create_mapping()
+    self._used_qubits = set()
+    self._pending: List[Tuple[Type, int, Union[int, List[int]], List]] = []
+    self._dag = DagBuilder()
+
+
+  def add_gate(self, type: Type, q1: int, q2: Union[int, List[int]] = -1, params: List = None) -> List[Gate]:
+    """
+      Appends a gate to the circuit, see mapper.qasm.input.DagBuilder::add(...).
+      Returns the mapped gates, which have been committed by doing so.
+    """
+    qubits = q2 if type == Type.BARRIER else [q1, q2] if type == Type.CNOT or type == Type.SWAP else [q1]
+    if any(q >= self.device.qubit_count for q in qubits):
+      raise ValueError(f"The circuit uses more qubits than the device provides ({self.device.qubit_count})")
+    if type == Type.MEASURE:
+      self._clbit_count = max(self._clbit_count, q2 + 1)
+
+    self._pending.append((type, q1, q2, params))
+    self._dag.add(type, q1, q2, params)
+
+    committed = []
+    while self._dag.depth >= (self.window + self.checkpoint_look_ahead) * self.checkpoint_offset:
+      committed.extend(self._map_window(False))
+    return committed
+
+
+  def add_qasm_line(self, line: str) -> List[Gate]:
+    """
+      Appends the gates of a single qasm line to the circuit.
+      Returns the mapped gates, which have been committed by doing so.
+    """
+    committed = []
+    for gate in self._reader.read_line(line):
+      committed.extend(self.add_gate(*gate))
+    return committed
+
+
+  def flush(self) -> List[Gate]:
+    """
+      Maps and commits all remaining gates, i.e. the circuit is complete.
+    """
+    if not self._pending:
+      return []
+    return self._map_window(True)
+
+
+  def map_lines(self, lines: Iterable[str]) -> Iterator[Gate]:
+    """
+      Maps the given qasm lines, yielding the mapped gates as soon as they are committed.
+    """
+    for line in lines:
+      yield from self.add_qasm_line(line)
+    yield from self.flush()
+
+
+  def qasm_header(self) -> str:
+    """
+      Returns the header of the mapped qasm circuit, which has to precede the committed gates.
+    """
+    clbit_count = max(self._clbit_count, self._reader.clbit_count)
+    header = f'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[{self.device.qubit_count}];\n'
+    if clbit_count > 0:
+      header += f"creg c[{clbit_count}];\n"
+    return header
+
+
+  def info(self) -> MappingInfo:
+    """
+      Returns the information on the gates committed so far.
+    """
+    return MappingInfo(self.swaps, self.free_swaps, self.cost, self.initial_mapping, self.stats)
+
+
+  def _map_window(self, flush: bool) -> List[Gate]:
+    """
+      Maps the buffered gates, committing the ones up to the window-th checkpoint (or all if flush is set).
+    """
+    # the buffered gates are a truncated circuit, which is closed by a sink (see DagBuilder::add_sink(...))
+    # its params are a fresh list, so its output can be recognized and dropped
+    sink = self._dag.add_sink([])
+    gates = self._dag.gates
+    checkpoint = add_checkpoints(self._dag.working_set, self.checkpoint_offset)
+    remaining_cost = sum(g.cost() for g in gates)
+    state = State({ checkpoint }, set(), self._mapping, 0, remaining_cost, None, None, set(self._used_qubits), checkpoint)
+
+    result = astar({ state }, self.device.costs, self.device.neighbours, self.checkpoint_look_ahead, self.prune_look_ahead, self.stats, self.weight, self.focal, self.partial)
+
+    committed = result
+    if not flush:
+      cut = checkpoint
+      for _ in range(self.window):
+        cut = cut.next if cut.next is not None else cut
+      committed = _find_execution(result, cut) or result
+
+    outputs = [g for g in _resolve_state(committed) if g.params is not sink.params]
+    outputs, _, free_swaps = _backpropagate_free_swaps(outputs, self.device.qubit_count, self.initial_mapping)
+
+    self.cost += committed.cost
+    self.free_swaps += free_swaps
+    self.swaps += sum(1 for g in outputs if g.type == Type.SWAP)
+    self._mapping = committed.mapping
+    for gate in outputs:
+      self._used_qubits.add(gate.q1)
+      if gate.type == Type.CNOT or gate.type == Type.SWAP:
+        self._used_qubits.add(gate.q2)
+      elif gate.type == Type.BARRIER:
+        self._used_qubits.update(gate.q2)
+
+    # the committed gates are closed under dependencies, so the rest still forms a valid circuit
+    resolved = committed.resolved_gates
+    self._pending = [pending for pending, gate in zip(self._pending, gates) if gate not in resolved]
+    self._dag = DagBuilder()
+    for pending in self._pending:
+      self._dag.add(*pending)
+
+    return outputs
+
+
+def _find_execution(state: State, checkpoint: Checkpoint) -> State:
+  """
+    Returns the state, in which the given checkpoint was executed, or None.
+  """
+  while state:
+    if isinstance(state.output, list) and any(g is checkpoint for g in state.output):
+      return state
+    state = state.parent
+  return None
+
+
+def map_online(input_file: str, output_file: str, coupling_map: Union[List[List[int]], Device], checkpoint_offset: int = 3, checkpoint_look_ahead: int = 2, window: int = 2, prune_look_ahead: int = None, weight: float = 1, focal: float = None, partial: float = None) -> MappingInfo:
+  """
+    Maps the circuit given in input_file like mapper.mapper.map(...), but reads and writes it line by line
+    using an OnlineMapper, i.e. the mapped gates are written as soon as they are committed.
+  """
+  mapper = OnlineMapper(coupling_map, checkpoint_offset, checkpoint_look_ahead, window, prune_look_ahead, weight, focal, partial)
+
+  with open(input_file) as input, open(output_file, "w") as output:
+    header = False
+    for gate in mapper.map_lines(input):
+      if not header:
+        output.write(mapper.qasm_header())
+        header = True
+      output.write(gate_to_qasm(gate) + "\n")
+
+    if not header:
+      output.write(mapper.qasm_header())
+    output.write(create_mapping_comment(mapper.initial_mapping) + "\n")
+
+  return mapper.info()
@@ -0,0 +1,119 @@
+import random
+from typing import Callable, Dict, List
+
+
+def generate(kind: str, qubits: int, depth: int, cnot_density: float = 0.5, seed: int = None) -> str:
+  """
+    Generates a synthetic circuit as qasm text, using only gates supported by mapper.qasm.input.read_gates(...).
+    The kind is one of GENERATORS, depth is the amount of layers (or repeated blocks) and
+    cnot_density is the probability of each possible cnot of a layer to be emitted.
+    The same seed always results in the same circuit.
+  """
+  if kind not in GENERATORS:
+    raise ValueError(f"Unknown circuit kind: {kind}")
+  if qubits < 2:
+    raise ValueError("At least 2 qubits are needed")
+
+  rng = random.Random(seed)
+  lines = [
+    "OPENQASM 2.0;",
+    'include "qelib1.inc";',
+    f"qreg q[{qubits}];",
+    f"creg c[{qubits}];",
+  ]
+  GENERATORS[kind](lines, rng, qubits, depth, cnot_density)
+  lines.append("barrier " + ",".join(f"q[{q}]" for q in range(qubits)) + ";")
+  lines.extend(f"measure q[{q}] -> c[{q}];" for q in range(qubits))
+  return "\n".join(lines) + "\n"
+
+
+def _random_layers(lines: List[str], rng: random.Random, qubits: int, depth: int, cnot_density: float):
+  """
+    Every layer pairs up the qubits at random, each pair is connected by a cnot with
+    probability cnot_density, all other qubits get a single qubit gate.
+  """
+  for _ in range(depth):
+    order = list(range(qubits))
+    rng.shuffle(order)
+    for q1, q2 in zip(order[0::2], order[1::2]):
+      if rng.random() < cnot_density:
+        _cx(lines, q1, q2)
+      else:
+        _single(lines, rng, q1)
+        _single(lines, rng, q2)
+    if qubits % 2 == 1:
+      _single(lines, rng, order[-1])
+
+
+def _qft_like(lines: List[str], rng: random.Random, qubits: int, depth: int, cnot_density: float):
+  """
+    Repeats depth times an all-to-all block: every qubit interacts with every following
+    qubit (with probability cnot_density) by a controlled rotation, i.e. cnot, rz, cnot.
+  """
+  for _ in range(depth):
+    for q1 in range(qubits):
+      _single(lines, rng, q1)
+      for q2 in range(q1 + 1, qubits):
+        if rng.random() < cnot_density:
+          _cx(lines, q2, q1)
+          _rz(lines, rng, q1)
+          _cx(lines, q2, q1)
+
+
+def _ghz_chain(lines: List[str], rng: random.Random, qubits: int, depth: int, cnot_density: float):
+  """
+    Repeats depth times a ghz preparation, i.e. a chain of cnots along all qubits.
+    Each link of the chain is emitted with probability cnot_density, but at least the first one.
+  """
+  for _ in range(depth):
+    lines.append("rz(pi/2) q[0];")
+    lines.append("sx q[0];")
+    lines.append("rz(pi/2) q[0];")
+    for q in range(qubits - 1):
+      if q == 0 or rng.random() < cnot_density:
+        _cx(lines, q, q + 1)
+
+
+def _adder_like(lines: List[str], rng: random.Random, qubits: int, depth: int, cnot_density: float):
+  """
+    Repeats depth times a ripple block, similar to a ripple carry adder: neighbouring
+    triples of qubits are entangled by a majority like sequence of cnots and rotations,
+    once upwards and once downwards. Each triple is used with probability cnot_density.
+  """
+  if qubits < 3:
+    raise ValueError("At least 3 qubits are needed for an adder like circuit")
+
+  triples = [(q, q + 1, q + 2) for q in range(qubits - 2)]
+  for _ in range(depth):
+    used = [t for t in triples if rng.random() < cnot_density] or triples[:1]
+    for a, b, c in used + list(reversed(used)):
+      _cx(lines, c, b)
+      _cx(lines, c, a)
+      _rz(lines, rng, a)
+      _cx(lines, a, b)
+      _rz(lines, rng, b)
+      _single(lines, rng, c)
+
+
+def _cx(lines: List[str], q1: int, q2: int):
+  lines.append(f"cx q[{q1}],q[{q2}];")
+
+
+def _rz(lines: List[str], rng: random.Random, qubit: int):
+  lines.append(f"rz({rng.choice([-7, -5, -3, -1, 1, 3, 5, 7])}*pi/8) q[{qubit}];")
+
+
+def _single(lines: List[str], rng: random.Random, qubit: int):
+  gate = rng.choice(["rz", "sx", "x"])
+  if gate == "rz":
+    _rz(lines, rng, qubit)
+  else:
+    lines.append(f"{gate} q[{qubit}];")
+
+
+GENERATORS: Dict[str, Callable[[List[str], random.Random, int, int, float], None]] = {
+  "random": _random_layers,
+  "qft": _qft_like,
+  "ghz": _ghz_chain,
+  "adder": _adder_like,
+}
@@ -1,4 +1,7 @@
-from typing import Dict, List, Set, Tuple
+import ast
+import math
+import re
+from typing import Dict, List, Set, Tuple, Union
 
 from qiskit import ClassicalRegister, QuantumCircuit
 from qiskit.test.mock.backends import FakeBrooklyn
@@ -7,48 +10,106 @@ from mapper.gate.type import Type
 from mapper.gate.gate import Gate
 
 
+Instruction = Tuple[Type, int, Union[int, Tuple[int, ...]], Tuple]
+
+
 def read_gates(file_name: str) -> Tuple[Set[Gate], List[Gate], List[ClassicalRegister]]:
   """
     Reads the given .qasm file, returning a working set,
     the gates of the quantum registers and the classical registers
   """
-  qc = QuantumCircuit.from_qasm_file(file_name)
+  return parse_file(file_name).gates()
+
+
+def read_qasm(qasm: str) -> Tuple[Set[Gate], List[Gate], List[ClassicalRegister]]:
+  """
+    Reads the given qasm text, see read_gates(...)
+  """
+  return parse_qasm(qasm).gates()
+
+
+def read_circuit(qc: QuantumCircuit) -> Tuple[Set[Gate], List[Gate], List[ClassicalRegister]]:
+  """
+    Reads the given qiskit QuantumCircuit, see read_gates(...)
+  """
+  return parse_circuit(qc).gates()
+
+
+def parse_file(file_name: str) -> "ParsedCircuit":
+  """
+    Parses the given .qasm file into a ParsedCircuit
+  """
+  return parse_circuit(QuantumCircuit.from_qasm_file(file_name))
+
+
+def parse_qasm(qasm: str) -> "ParsedCircuit":
+  """
+    Parses the given qasm text into a ParsedCircuit
+  """
+  return parse_circuit(QuantumCircuit.from_qasm_str(qasm))
+
+
+def parse_circuit(qc: QuantumCircuit) -> "ParsedCircuit":
+  """
+    Parses the given qiskit QuantumCircuit into a ParsedCircuit
+  """
   offsets = _get_qreg_offsets(qc)
-  working_set, gates = _map_gates(qc, offsets)
-  return working_set, gates, qc.cregs
+  cregs = tuple((creg.name, creg.size) for creg in qc.cregs)
+  return ParsedCircuit(_read_instructions(qc, offsets), qc.num_qubits, cregs)
+
+
+class ParsedCircuit:
+  """
+    A parsed circuit, which is never modified by the mapping process.
+    It only consists of tuples of plain values, so it can be pickled cheaply and shared with
+    worker processes (e.g. by forking). Every call to ParsedCircuit::gates() builds a fresh DAG,
+    which can then be checkpointed (and thereby modified) for a single run, so a circuit has to
+    be parsed only once for any number of checkpoint offsets or devices.
+  """
+  def __init__(self, instructions: Tuple[Instruction, ...], qubit_count: int, cregs: Tuple[Tuple[str, int], ...]):
+    self.instructions = instructions
+    self.qubit_count = qubit_count
+    self.cregs = cregs
+
 
+  def gates(self) -> Tuple[Set[Gate], List[Gate], List[ClassicalRegister]]:
+    """
+      Returns a new working set, gates and classical registers, see read_gates(...)
+    """
+    dag = DagBuilder()
+    for type, q1, q2, params in self.instructions:
+      dag.add(type, q1, list(q2) if type == Type.BARRIER else q2, list(params))
+    return dag.working_set, dag.gates, [ClassicalRegister(size, name) for name, size in self.cregs]
 
-def _map_gates(qc: QuantumCircuit, offsets: Dict[str, int]) -> Tuple[Set[Gate], List[Gate]]:
+
+  def __len__(self) -> int:
+    return len(self.instructions)
+
+
+  def __repr__(self) -> str:
+    return f"Parsed circuit with {len(self.instructions)} gates on {self.qubit_count} qubits"
+
+
+def _read_instructions(qc: QuantumCircuit, offsets: Dict[str, int]) -> Tuple[Instruction, ...]:
   """
-    Returns the initial working set, which are all gates without dependencies
+    Returns the gates of the circuit as (type, q1, q2, params), using the flattened qubit indices
   """
-  working_set = set()
-  last_gate = dict() # maps qubits to the last gates which used them
-  gates = []
+  instructions = []
 
   for instr in qc.data:
     q1 = instr[1][0].index + offsets[instr[1][0].register.name]
     q2 = -1
     name = instr[0].name
-    params = instr[0].params
-    parents = set()
-    
-    if q1 in last_gate:
-      parents.add(last_gate[q1])
+    params = tuple(instr[0].params)
 
     if name == Type.CNOT.value or name == Type.SWAP.value:
       q2 = instr[1][1].index + offsets[instr[1][1].register.name]
-      if q2 in last_gate:
-        parents.add(last_gate[q2])
 
     elif name == Type.MEASURE.value:
       q2 = instr[2][0].index
 
     elif name == Type.BARRIER.value:
-      q2 = [c.index + offsets[c.register.name] for c in instr[1]]
-      for d in q2:
-        if d in last_gate:
-          parents.add(last_gate[d])
+      q2 = tuple(c.index + offsets[c.register.name] for c in instr[1])
 
     elif name == Type.X.value or name == Type.ROTATE_Z.value or name == Type.SQRT.value:
       # noting to do
@@ -57,24 +118,167 @@ def _map_gates(qc: QuantumCircuit, offsets: Dict[str, int]) -> Tuple[Set[Gate],
     else:
       raise ValueError(f"Encountered unknown gate: {name}")
 
-    gate = Gate(Type.from_name(name), set(), parents, q1, q2, params)
-    gates.append(gate)
+    instructions.append((Type.from_name(name), q1, q2, params))
 
-    last_gate[q1] = gate
-    if name == Type.CNOT.value or name == Type.SWAP.value:
-      last_gate[q2] = gate
-    
-    elif name == Type.BARRIER.value:
-      for qubit in q2:
-        last_gate[qubit] = gate
+  return tuple(instructions)
+
+
+class DagBuilder:
+  """
+    Builds the DAG of dependencies between the gates, one gate at a time.
+  """
+  def __init__(self):
+    self.working_set: Set[Gate] = set()
+    self.gates: List[Gate] = []
+    self.depth = 0
+    self._last_gate: Dict[int, Gate] = dict() # maps qubits to the last gates which used them
+
+
+  def add(self, type: Type, q1: int, q2: Union[int, List[int]] = -1, params: List = None) -> Gate:
+    """
+      Appends a gate to the circuit, returning it.
+      For measure gates q2 is the classical bit, for barriers the list of qubits.
+    """
+    if type == Type.CNOT or type == Type.SWAP:
+      qubits = [q1, q2]
+    elif type == Type.BARRIER:
+      qubits = [q1, *q2]
+    else:
+      qubits = [q1]
+
+    parents = { self._last_gate[q] for q in qubits if q in self._last_gate }
+    gate = Gate(type, set(), parents, q1, q2, params)
+    self.gates.append(gate)
+    self.depth = max(self.depth, gate.depth)
+
+    for qubit in qubits:
+      self._last_gate[qubit] = gate
 
     for parent in parents:
       parent.children.add(gate)
 
     if len(parents) == 0:
-      working_set.add(gate)
+      self.working_set.add(gate)
+
+    return gate
+
+
+  def add_sink(self, params: List = None) -> Gate:
+    """
+      Appends a barrier over all qubits used so far, so every gate has a successor.
+      Needed for a prefix of a circuit, as otherwise the checkpoints do not depend on the last gate of each qubit.
+    """
+    qubits = sorted(self._last_gate)
+    return self.add(Type.BARRIER, qubits[0], qubits, params)
+
+
+class QasmLineReader:
+  """
+    Reads a qasm circuit line by line, without parsing the whole circuit up front.
+    Supports the same gates as read_gates(...); the registers are flattened into a single
+    quantum and a single classical register, in the order of their declaration.
+  """
+  def __init__(self):
+    self.qubit_count = 0
+    self.clbit_count = 0
+    self._qregs: Dict[str, Tuple[int, int]] = {} # name -> (offset, size)
+    self._cregs: Dict[str, Tuple[int, int]] = {}
+
+
+  def read_line(self, line: str) -> List[Tuple[Type, int, Union[int, List[int]], List]]:
+    """
+      Reads a single line, returning the gates in it as (type, q1, q2, params).
+      Declarations and comments do not contain any gates.
+    """
+    gates = []
+    for statement in line.split("//")[0].split(";"):
+      statement = statement.strip()
+      if statement:
+        gates.extend(self._read_statement(statement))
+    return gates
+
+
+  def _read_statement(self, statement: str) -> List[Tuple[Type, int, Union[int, List[int]], List]]:
+    if statement.startswith("OPENQASM") or statement.startswith("include"):
+      return []
+
+    declaration = re.fullmatch(r"(qreg|creg)\s+(\w+)\s*\[\s*(\d+)\s*\]", statement)
+    if declaration:
+      kind, name, size = declaration.group(1), declaration.group(2), int(declaration.group(3))
+      if kind == "qreg":
+        self._qregs[name] = (self.qubit_count, size)
+        self.qubit_count += size
+      else:
+        self._cregs[name] = (self.clbit_count, size)
+        self.clbit_count += size
+      return []
+
+    instruction = re.fullmatch(r"(\w+)\s*(?:\((.*)\))?\s+(.+)", statement)
+    if not instruction:
+      raise ValueError(f"Could not read statement: {statement}")
+    name, params, operands = instruction.group(1), instruction.group(2), instruction.group(3)
+    params = [_evaluate_parameter(p) for p in params.split(",")] if params else []
+
+    if name == Type.MEASURE.value:
+      qubits, clbits = operands.split("->")
+      return [(Type.MEASURE, q, c, params) for q, c in zip(self._bits(qubits, self._qregs), self._bits(clbits, self._cregs))]
+
+    operands = [self._bits(operand, self._qregs) for operand in operands.split(",")]
+    if name == Type.BARRIER.value:
+      qubits = [q for operand in operands for q in operand]
+      return [(Type.BARRIER, qubits[0], qubits, params)]
+
+    if name == Type.CNOT.value or name == Type.SWAP.value:
+      return [(Type.from_name(name), q1, q2, params) for q1, q2 in zip(*operands)]
+
+    if name == Type.X.value or name == Type.ROTATE_Z.value or name == Type.SQRT.value:
+      return [(Type.from_name(name), q, -1, params) for q in operands[0]]
+
+    raise ValueError(f"Encountered unknown gate: {name}")
+
+
+  def _bits(self, operand: str, registers: Dict[str, Tuple[int, int]]) -> List[int]:
+    """
+      Returns the flattened indices of an operand, which is either a single bit or a whole register.
+    """
+    bit = re.fullmatch(r"(\w+)\s*(?:\[\s*(\d+)\s*\])?", operand.strip())
+    if not bit or bit.group(1) not in registers:
+      raise ValueError(f"Encountered unknown register: {operand.strip()}")
+    offset, size = registers[bit.group(1)]
+    if bit.group(2) is None:
+      return list(range(offset, offset + size))
+    return [offset + int(bit.group(2))]
+
+
+def _evaluate_parameter(expression: str) -> float:
+  """
+    Evaluates a gate parameter, which may only consist of numbers, pi and arithmetic operators.
+  """
+  def evaluate(node: ast.AST) -> float:
+    if isinstance(node, ast.Expression):
+      return evaluate(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+      return node.value
+    if isinstance(node, ast.Name) and node.id == "pi":
+      return math.pi
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+      value = evaluate(node.operand)
+      return value if isinstance(node.op, ast.UAdd) else -value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+      return _OPERATORS[type(node.op)](evaluate(node.left), evaluate(node.right))
+    raise ValueError(f"Could not evaluate parameter: {expression}")
+
+  return float(evaluate(ast.parse(expression.strip(), mode="eval")))
+
+
+_OPERATORS = {
+  ast.Add: lambda a, b: a + b,
+  ast.Sub: lambda a, b: a - b,
+  ast.Mult: lambda a, b: a * b,
+  ast.Div: lambda a, b: a / b,
+  ast.Pow: lambda a, b: a ** b,
+}
 
-  return working_set, gates
 
 def _get_qreg_offsets(qc: QuantumCircuit) -> Dict[str, int]:
   """
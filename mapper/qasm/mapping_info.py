@@ -1,3 +1,6 @@
+from typing import Dict
+
+from mapper.algorithms.stats import SearchStats
 from mapper.state.mapping import Mapping
 
 
@@ -5,11 +8,26 @@ class MappingInfo:
   """
     Collected information about one mapping pass.
   """
-  def __init__(self, swaps: int, free_swaps: int, cost: int, initial_mapping: Mapping):
+  def __init__(self, swaps: int, free_swaps: int, cost: int, initial_mapping: Mapping, stats: SearchStats = None):
     self.swaps = swaps
     self.free_swaps = free_swaps
     self.cost = cost
     self.initial_mapping = initial_mapping
+    self.stats = stats
+
+
+  def to_dict(self) -> Dict:
+    """
+      Returns a json serializable representation of this info.
+      The initial mapping is given as list, where the i-th entry is the physical qubit of logical qubit i.
+    """
+    return {
+      "swaps": int(self.swaps),
+      "free_swaps": int(self.free_swaps),
+      "cost": int(self.cost),
+      "initial_mapping": [int(p) for p in self.initial_mapping._logical_to_physical],
+      "stats": self.stats.to_dict() if self.stats is not None else None,
+    }
 
 
   def __repr__(self) -> str:
@@ -3,22 +3,28 @@ from typing import List, Tuple
 from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
 import numpy as np
 
+from mapper.device import Region
 from mapper.gate.gate import Gate
 from mapper.gate.type import Type
 from mapper.state.mapping import Mapping
 from mapper.state.state import State
 
 
-def state_to_circuit(state: State, cregs: List[ClassicalRegister], initial_mapping: Mapping) -> Tuple[QuantumCircuit, Mapping, int, int]:
+def state_to_circuit(state: State, cregs: List[ClassicalRegister], initial_mapping: Mapping, region: Region = None) -> Tuple[QuantumCircuit, Mapping, int, int]:
   """
-    Resolves the state backwards, producing a qiskit QuantumCircuit
+    Resolves the state backwards, producing a qiskit QuantumCircuit.
+    If the search ran on a region of the device, the circuit uses the qubits of the whole device.
   """
   qubit_count = state.mapping._qubit_count
   swaps = 0
-  q = QuantumRegister(qubit_count, "q")
-  qc = QuantumCircuit(q, *cregs)
   gates = _resolve_state(state)
   gates, initial_mapping, free_swaps = _backpropagate_free_swaps(gates, qubit_count, initial_mapping)
+  if region is not None:
+    gates, initial_mapping = region.to_device(gates, initial_mapping)
+    qubit_count = region.device.qubit_count
+
+  q = QuantumRegister(qubit_count, "q")
+  qc = QuantumCircuit(q, *cregs)
 
   identity = initial_mapping._logical_to_physical[initial_mapping._physical_to_logical]
   if not np.all(np.arange(qubit_count) == identity):
@@ -61,6 +67,30 @@ def create_mapping_comment(mapping: Mapping) -> str:
   return comment + mapping_text
 
 
+def circuit_to_qasm(qc: QuantumCircuit, initial_mapping: Mapping) -> str:
+  """
+    Returns the qasm text of the mapped circuit, including the comment for the initial mapping.
+  """
+  return qc.qasm() + create_mapping_comment(initial_mapping) + "\n"
+
+
+def gate_to_qasm(gate: Gate) -> str:
+  """
+    Returns the qasm statement of a mapped gate, using the quantum register q and the classical register c.
+  """
+  if gate.type == Type.CNOT or gate.type == Type.SWAP:
+    return f"{gate.type.value} q[{gate.q1}],q[{gate.q2}];"
+  elif gate.type == Type.X or gate.type == Type.SQRT:
+    return f"{gate.type.value} q[{gate.q1}];"
+  elif gate.type == Type.ROTATE_Z:
+    return f"rz({gate.params[0]}) q[{gate.q1}];"
+  elif gate.type == Type.MEASURE:
+    return f"measure q[{gate.q1}] -> c[{gate.q2}];"
+  elif gate.type == Type.BARRIER:
+    return "barrier " + ",".join(f"q[{q}]" for q in gate.q2) + ";"
+  raise ValueError(f"Encountered invalid gate: {gate.type}")
+
+
 def _backpropagate_free_swaps(gates: List[Gate], qubit_count: int, initial_mapping: Mapping) -> Tuple[List[Gate], Mapping, int]:
   """
     Applies the free swap gates, which essentially compute an initial mapping
@@ -96,15 +126,20 @@ def _backpropagate_free_swaps(gates: List[Gate], qubit_count: int, initial_mappi
 
 def _resolve_state(state: State) -> List[Gate]:
   """
-    Reverses the states, outputing a gate each
+    Reverses the states, outputing the gates of each.
+    Checkpoints are not part of the circuit and are therefore left out.
   """
-  gates = []
+  outputs = []
 
   while state:
     if state.output:
-      gates.append(state.output)
+      outputs.append(state.output)
     state = state.parent
 
-  # the first state has no output
-  return list(reversed(gates))[1:]
-  
\ No newline at end of file
+  gates = []
+  for output in reversed(outputs):
+    if isinstance(output, list):
+      gates.extend(g for g in output if g.type != Type.CHECKPOINT)
+    elif output.type != Type.CHECKPOINT:
+      gates.append(output)
+  return gates
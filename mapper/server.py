@@ -0,0 +1,251 @@
+import json
+import os
+import signal
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+from mapper.device import Device
+from mapper.mapper import map_qasm
+
+
+JOB_PARAMETERS = { "checkpoint_offset", "checkpoint_look_ahead", "prune_look_ahead", "region_slack", "weight", "focal", "partial", "checkpoint_budget" }
+
+_device: Device = None
+
+
+def _init_worker(coupling_map: List[List[int]]):
+  """
+    Sets up the device tables once per worker process, so they stay warm between jobs.
+  """
+  global _device
+  _device = Device(coupling_map)
+
+
+def _on_timeout(signum, frame):
+  raise TimeoutError("Mapping exceeded its time limit")
+
+
+def _map_job(qasm: str, parameters: Dict, timeout: float) -> Tuple[str, Dict]:
+  """
+    Maps a single circuit inside of a worker process.
+    The time limit is enforced in the worker itself, so a job which runs too long
+    does not block the worker for any following job.
+  """
+  signal.signal(signal.SIGALRM, _on_timeout)
+  signal.setitimer(signal.ITIMER_REAL, timeout)
+  try:
+    qasm, info = map_qasm(qasm, _device, **parameters)
+    return qasm, info.to_dict()
+  finally:
+    signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ServerMetrics:
+  """
+    Throughput and latency of the jobs processed by a MappingServer.
+  """
+  def __init__(self, window: int = 1000):
+    self._lock = threading.Lock()
+    self._latencies = deque(maxlen=window)
+    self.start = time.time()
+    self.completed = 0
+    self.failed = 0
+    self.timed_out = 0
+    self.rejected = 0
+    self.in_flight = 0
+
+
+  def count(self, counter: str):
+    with self._lock:
+      setattr(self, counter, getattr(self, counter) + 1)
+
+
+  def started(self):
+    with self._lock:
+      self.in_flight += 1
+
+
+  def finished(self, counter: str, latency: float):
+    with self._lock:
+      self.in_flight -= 1
+      setattr(self, counter, getattr(self, counter) + 1)
+      self._latencies.append(latency)
+
+
+  def to_dict(self) -> Dict:
+    """
+      Returns a json serializable snapshot of the metrics.
+      Latencies are computed over the last window jobs.
+    """
+    with self._lock:
+      uptime = time.time() - self.start
+      latencies = sorted(self._latencies)
+      snapshot = {
+        "uptime": uptime,
+        "completed": self.completed,
+        "failed": self.failed,
+        "timed_out": self.timed_out,
+        "rejected": self.rejected,
+        "in_flight": self.in_flight,
+        "throughput": self.completed / uptime if uptime > 0 else 0,
+      }
+    if latencies:
+      snapshot["latency"] = {
+        "mean": sum(latencies) / len(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "max": latencies[-1],
+      }
+    return snapshot
+
+
+class MappingServer:
+  """
+    Queues mapping jobs onto a pool of warm worker processes.
+    At most max_pending jobs are queued or running at once, further jobs are rejected.
+  """
+  def __init__(self, coupling_map: List[List[int]], workers: int = None, max_pending: int = None, timeout: float = 60):
+    self.workers = workers or os.cpu_count() or 1
+    self.max_pending = max_pending or 4 * self.workers
+    self.timeout = timeout
+    self.metrics = ServerMetrics()
+    self._slots = threading.BoundedSemaphore(self.max_pending)
+    self._futures = set()
+    self._futures_lock = threading.Lock()
+    self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(coupling_map, ))
+
+
+  def submit(self, qasm: str, parameters: Dict, timeout: float = None) -> Tuple[int, Dict]:
+    """
+      Maps the given circuit, blocking until it is done.
+      Returns a http status code together with the json response.
+    """
+    unknown = set(parameters).difference(JOB_PARAMETERS)
+    if unknown:
+      return 400, { "error": f"Unknown parameters: {', '.join(sorted(unknown))}" }
+
+    timeout = min(timeout or self.timeout, self.timeout)
+    if not self._slots.acquire(blocking=False):
+      self.metrics.count("rejected")
+      return 503, { "error": "Too many pending jobs" }
+
+    start = time.time()
+    self.metrics.started()
+    future = None
+    try:
+      future = self._executor.submit(_map_job, qasm, parameters, timeout)
+      with self._futures_lock:
+        self._futures.add(future)
+      # the worker enforces the time limit, the additional slack covers the time spent in the queue
+      qasm, info = future.result(timeout=timeout + self.max_pending / self.workers * timeout)
+    except (TimeoutError, FutureTimeoutError):
+      future.cancel()
+      self.metrics.finished("timed_out", time.time() - start)
+      return 504, { "error": "Mapping timed out" }
+    except Exception as e:
+      self.metrics.finished("failed", time.time() - start)
+      return 422, { "error": str(e) }
+    finally:
+      with self._futures_lock:
+        self._futures.discard(future)
+      self._slots.release()
+
+    latency = time.time() - start
+    self.metrics.finished("completed", latency)
+    return 200, { "qasm": qasm, "info": info, "time": latency }
+
+
+  def shutdown(self):
+    # Executor.shutdown(cancel_futures=True) requires python 3.9
+    with self._futures_lock:
+      for future in self._futures:
+        future.cancel()
+    self._executor.shutdown()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+  """
+    POST /map with a json body { "qasm": ..., "timeout": ..., <parameters of mapper.mapper.map> }
+    GET /metrics returns the ServerMetrics
+  """
+  server_version = "LNNMapper"
+
+  def do_GET(self):
+    if self.path == "/metrics":
+      self._respond(200, self.server.mapping_server.metrics.to_dict())
+    elif self.path == "/health":
+      self._respond(200, { "status": "ok" })
+    else:
+      self._respond(404, { "error": f"Unknown path: {self.path}" })
+
+
+  def do_POST(self):
+    if self.path != "/map":
+      self._respond(404, { "error": f"Unknown path: {self.path}" })
+      return
+
+    try:
+      length = int(self.headers.get("Content-Length", 0))
+      payload = json.loads(self.rfile.read(length))
+      if not isinstance(payload, dict):
+        raise ValueError("Expected a json object")
+      qasm = payload.pop("qasm")
+      timeout = payload.pop("timeout", None)
+      if timeout is not None:
+        timeout = float(timeout)
+    except (ValueError, TypeError, KeyError):
+      self._respond(400, { "error": "Expected a json object with a qasm field (and a numeric timeout)" })
+      return
+
+    self._respond(*self.server.mapping_server.submit(qasm, payload, timeout))
+
+
+  def _respond(self, status: int, body: Dict):
+    data = json.dumps(body).encode()
+    self.send_response(status)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(data)))
+    self.end_headers()
+    self.wfile.write(data)
+
+
+  def address_string(self) -> str:
+    # unix sockets do not have a client address
+    return self.client_address[0] if self.client_address else "unix"
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  daemon_threads = True
+
+
+def serve(coupling_map: List[List[int]], host: str = "127.0.0.1", port: int = 8000, socket_path: str = None, workers: int = None, max_pending: int = None, timeout: float = 60):
+  """
+    Serves mapping requests over http, either on the given local port or on a unix socket.
+    Blocks until interrupted.
+  """
+  mapping_server = MappingServer(coupling_map, workers, max_pending, timeout)
+  if socket_path is not None:
+    if os.path.exists(socket_path):
+      os.remove(socket_path)
+    httpd = _UnixHTTPServer(socket_path, _RequestHandler)
+    address = socket_path
+  else:
+    httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+    address = f"http://{host}:{port}"
+  httpd.mapping_server = mapping_server
+
+  print(f"Serving on {address} with {mapping_server.workers} workers")
+  try:
+    httpd.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    httpd.server_close()
+    mapping_server.shutdown()
+    if socket_path is not None and os.path.exists(socket_path):
+      os.remove(socket_path)
@@ -0,0 +1,95 @@
+from typing import Dict, List, Tuple, Union
+
+
+class SparseMapping:
+  """
+    Represents a mapping from physical to logical qubits, which only stores
+    the qubits not mapped onto themselves. Swapping and hashing therefore cost
+    O(displaced qubits) instead of O(qubit_count), which pays off for large devices.
+  """
+  def __init__(self, qubit_count: int, logical_to_physical: Dict[int, int] = None, physical_to_logical: Dict[int, int] = None):
+    if logical_to_physical is None:
+      if physical_to_logical is not None:
+        raise ValueError("physical_to_logical has to be None if logical_to_physical is None")
+      logical_to_physical = {}
+      physical_to_logical = {}
+    elif physical_to_logical is None:
+      physical_to_logical = { p: l for l, p in logical_to_physical.items() }
+
+    self._qubit_count = qubit_count
+    self._logical_to_physical = logical_to_physical
+    self._physical_to_logical = physical_to_logical
+    self._hash = None
+
+
+  def swap(self, q1: int, q2: int) -> "SparseMapping":
+    """
+      Swaps the logical qubits q1 and q2
+    """
+    mapping = SparseMapping(self._qubit_count, self._logical_to_physical.copy(), self._physical_to_logical.copy())
+    mapping.swap_inplace(q1, q2)
+    return mapping
+
+
+  def swap_inplace(self, q1: int, q2: int):
+    """
+      Performs a swap operation inplace
+    """
+    p1, p2 = self.logical_to_physical(q1, q2)
+    _assign(self._logical_to_physical, q1, p2)
+    _assign(self._logical_to_physical, q2, p1)
+    _assign(self._physical_to_logical, p2, q1)
+    _assign(self._physical_to_logical, p1, q2)
+    self._hash = None
+
+
+  def logical_to_physical(self, l1: int, l2: int = 0) -> Tuple[int, int]:
+    """
+      Maps the logical qubits l1 and l2 to their current physical mapping
+    """
+    return _lookup(self._logical_to_physical, l1), _lookup(self._logical_to_physical, l2)
+
+
+  def physical_to_logical(self, p1: int, p2: int = 0) -> Tuple[int, int]:
+    """
+      Maps the physical qubits p1 and p2 to their current logical mapping.
+      An inverse of SparseMapping::logical_to_physical(...)
+    """
+    return _lookup(self._physical_to_logical, p1), _lookup(self._physical_to_logical, p2)
+
+
+  def __eq__(self, __o: object) -> bool:
+    if __o is None or not isinstance(__o, SparseMapping):
+      return False
+
+    return self._qubit_count == __o._qubit_count \
+      and self._logical_to_physical == __o._logical_to_physical
+
+
+  def __hash__(self) -> int:
+    if self._hash is None:
+      self._hash = self._qubit_count ^ hash(frozenset(self._logical_to_physical.items()))
+    return self._hash
+
+
+  def __repr__(self) -> str:
+    return ", ".join(f"{l} -> {p}" for l, p in sorted(self._logical_to_physical.items()))
+
+
+def _lookup(mapping: Dict[int, int], qubits: Union[int, List[int]]) -> Union[int, List[int]]:
+  """
+    Looks up a single qubit or, as used by barriers, a list of qubits.
+  """
+  if isinstance(qubits, list):
+    return [mapping.get(q, q) for q in qubits]
+  return mapping.get(qubits, qubits)
+
+
+def _assign(mapping: Dict[int, int], key: int, value: int):
+  """
+    Assigns value to key, dropping the entry if the qubit is mapped onto itself.
+  """
+  if key == value:
+    mapping.pop(key, None)
+  else:
+    mapping[key] = value
@@ -1,7 +1,8 @@
-from typing import Dict, Set
+from typing import Dict, List, Set, Tuple
 
 import numpy as np
 
+from mapper.algorithms.stats import SearchStats
 from mapper.gate.checkpoint import Checkpoint
 from mapper.gate.gate import Gate
 from mapper.gate.type import Type
@@ -20,6 +21,7 @@ class State:
       Creates a new state.
       The working_set represents the gates which are currently considered,
       the resolved_gates all the gates which have already been resolved.
+      The output is either a single gate or a list of gates, which were executed at once.
     """
     self.working_set = working_set
     self.resolved_gates = resolved_gates
@@ -32,14 +34,14 @@ class State:
     self.checkpoint = checkpoint
 
   
-  def total_cost(self, costs: np.ndarray, checkpoint_look_ahead: int) -> int:
+  def total_cost(self, costs: np.ndarray, checkpoint_look_ahead: int, weight: float = 1) -> float:
     """
-      Returns the total cost, e.g. cost until now + heuristic cost until the end
+      Returns the total cost, e.g. cost until now + heuristic cost until the end (multiplied by weight)
     """
-    return self.cost + self._heuristic(costs, checkpoint_look_ahead)
+    return self.cost + weight * self.heuristic(costs, checkpoint_look_ahead)
 
 
-  def _heuristic(self, costs: np.ndarray, checkpoint_look_ahead: int) -> int:
+  def heuristic(self, costs: np.ndarray, checkpoint_look_ahead: int) -> int:
     """
       Returns the estimated cost until the end
     """
@@ -57,7 +59,7 @@ class State:
         continue
   
       p1, p2 = self.mapping.logical_to_physical(gate.q1, gate.q2)
-      cost = costs[p1, p2] - 1
+      cost = int(costs[p1, p2]) - 1
       sum += cost
     return sum
 
@@ -78,19 +80,94 @@ class State:
     return False
 
   
-  def successors(self, costs: np.ndarray, neighbours: Dict[int, Set[int]]) -> Set["State"]:
+  def successors(self, costs: np.ndarray, neighbours: Dict[int, Set[int]], prune_look_ahead: int = None, stats: SearchStats = None) -> Set["State"]:
     """
-      Calculates all possible successor states to this state
+      Calculates all possible successor states to this state.
+      If prune_look_ahead is given, only swaps which lower the distance of a
+      resolvable multi qubit gate or of a CNOT within the next prune_look_ahead
+      checkpoints are generated.
     """
-    successors = set()
+    state = self._execute_gates(costs)
+    if state is None:
+      return self._generate_successors(costs, neighbours, prune_look_ahead, stats)
+
+    if state.is_done():
+      if stats is not None:
+        stats.record_expansion(1, 1)
+      return { state }
+    # all executable gates have been executed, so the new state only needs swaps (or bridges)
+    return state._generate_successors(costs, neighbours, prune_look_ahead, stats)
 
+
+  def expansion(self, costs: np.ndarray, neighbours: Dict[int, Set[int]], prune_look_ahead: int = None, stats: SearchStats = None) -> Tuple["State", Set["State"], Set[Tuple[int, int]]]:
+    """
+      Like State::successors(...), but the swaps are not generated. Instead, the physical edges to swap are
+      returned together with the state they originate from, see State::swap_costs(...) and State::generate_swap(...).
+      Returns the origin, the already generated successors (bridges or the final state) and the edges.
+    """
     state = self._execute_gates(costs)
-    if state is not None:
-      if state.is_done():
-        return { state }
-      return state.successors(costs, neighbours)
+    if state is None:
+      state = self
+    elif state.is_done():
+      if stats is not None:
+        stats.record_expansion(1, 1)
+      return state, { state }, set()
+
+    bridges, edges = state._generate_candidates(costs, neighbours, prune_look_ahead, stats)
+    return state, bridges, edges
+
+
+  def swap_costs(self, edges: Set[Tuple[int, int]], costs: np.ndarray, checkpoint_look_ahead: int, weight: float = 1) -> List[Tuple[float, int, int]]:
+    """
+      Returns the total cost (see State::total_cost(...)) of the states, which swapping the physical qubits
+      of each edge results in, without generating the states or their mappings (see State::generate_swap(...)).
+      Only the CNOT gates touching the swapped qubits are re-evaluated.
+    """
+    pairs: Dict[int, List[Tuple[int, int]]] = {} # physical qubit -> CNOT gates using it (as physical qubits)
+    swaps = 0
+    for gate in self.checkpoint.prev.gates_to_consider(checkpoint_look_ahead):
+      if gate.type != Type.CNOT or gate in self.resolved_gates:
+        continue
+
+      p1, p2 = self.mapping.logical_to_physical(gate.q1, gate.q2)
+      swaps += int(costs[p1, p2]) - 1
+      pairs.setdefault(p1, []).append((p1, p2))
+      pairs.setdefault(p2, []).append((p1, p2))
+
+    swapped = lambda q, p, pn: pn if q == p else p if q == pn else q
+    total_costs = []
+    for p, pn in edges:
+      delta = 0
+      touched = pairs.get(p, []) + [pair for pair in pairs.get(pn, []) if p not in pair]
+      for p1, p2 in touched:
+        delta += int(costs[swapped(p1, p, pn), swapped(p2, p, pn)]) - int(costs[p1, p2])
+
+      cost = self.cost
+      if p in self.used_qubits or pn in self.used_qubits:
+        cost += Type.SWAP.cost
+      total_costs.append((cost + weight * (self.remaining_cost + (swaps + delta) * 30), p, pn))
+    return total_costs
+
+
+  def _generate_successors(self, costs: np.ndarray, neighbours: Dict[int, Set[int]], prune_look_ahead: int, stats: SearchStats) -> Set["State"]:
+    """
+      Generates the bridge and swap successors of a state, in which no gate can be executed.
+    """
+    successors, edges = self._generate_candidates(costs, neighbours, prune_look_ahead, stats)
+    for p, pn in edges:
+      successors.add(self.generate_swap(p, pn))
+    return successors
+
+
+  def _generate_candidates(self, costs: np.ndarray, neighbours: Dict[int, Set[int]], prune_look_ahead: int, stats: SearchStats) -> Tuple[Set["State"], Set[Tuple[int, int]]]:
+    """
+      Generates the bridge successors of a state, in which no gate can be executed,
+      and returns them together with the physical edges, which should be swapped.
+    """
+    bridges = set()
     resolvables = [(g, g.can_be_resolved(self.resolved_gates)) for g in self.working_set]
 
+    swap_qubits = []
     for gate, resolvable in resolvables:
       execution_distance = gate.execution_distance(costs, self.mapping)
       if resolvable:
@@ -100,61 +177,116 @@ class State:
           if execution_distance == State.BRIDGE_DISTANCE: # bridges work only for a certain distance
             # using the provided architecture, only 1 bridge will ever be
             # possible, but we account for other architectures as well
-            successors.update(self._generate_bridges(gate, neighbours))
+            bridges.update(self._generate_bridges(gate, neighbours))
 
       # even if the gate is not resolvabe, we still generate swap gates
       if gate.is_multi_qubit_gate():
-        successors.update(self._generate_swaps(gate.q1, neighbours))
-        successors.update(self._generate_swaps(gate.q2, neighbours))
+        swap_qubits.append(gate.q1)
+        swap_qubits.append(gate.q2)
 
-    return successors
+    edges = None
+    if prune_look_ahead is not None:
+      edges = self._relevant_swaps(swap_qubits, resolvables, costs, neighbours, prune_look_ahead)
 
+    all_edges = None
+    if not edges or stats is not None:
+      all_edges = set()
+      for qubit in swap_qubits:
+        p, _ = self.mapping.logical_to_physical(qubit)
+        all_edges.update((min(p, pn), max(p, pn)) for pn in neighbours[p])
 
-  def _execute_gates(self, costs: np.ndarray) -> "State":
+    if not edges:
+      # without pruning (or if no swap is relevant) every swap is generated
+      edges = all_edges
+
+    if stats is not None:
+      stats.record_expansion(len(bridges) + len(all_edges), len(bridges) + len(edges))
+
+    return bridges, edges
+
+
+  def _relevant_swaps(self, qubits: List[int], resolvables: List[Tuple[Gate, bool]], costs: np.ndarray, neighbours: Dict[int, Set[int]], prune_look_ahead: int) -> Set[Tuple[int, int]]:
     """
-      Executes all gates, which can currently be executed
+      Returns the physical edges adjacent to the given logical qubits, which lower the
+      distance of at least one resolvable multi qubit gate or of a CNOT gate within the look ahead.
+      Each edge is returned only once, regardless from which of its endpoints it was reached.
     """
-    state = self
-    for gate in state.working_set: # TODO check this
-      executable = gate.can_be_executed(costs, state.mapping)
-      resolvable = gate.can_be_resolved(state.resolved_gates)
-      if executable and resolvable:
-        state = state._execute_gate(gate)
-
-    if state != self:
-      return state
-    return None
+    targets = set()
+    for gate, resolvable in resolvables:
+      if resolvable and gate.is_multi_qubit_gate():
+        targets.add(self.mapping.logical_to_physical(gate.q1, gate.q2))
+
+    if self.checkpoint.prev is not None:
+      for gate in self.checkpoint.prev.gates_to_consider(prune_look_ahead):
+        if gate.type != Type.CNOT or gate in self.resolved_gates:
+          continue
+        targets.add(self.mapping.logical_to_physical(gate.q1, gate.q2))
+
+    seen = set()
+    edges = set()
+    for qubit in qubits:
+      p, _ = self.mapping.logical_to_physical(qubit)
+      for pn in neighbours[p]:
+        edge = (min(p, pn), max(p, pn))
+        if edge in seen:
+          continue
+        seen.add(edge)
+        if _lowers_distance(edge, targets, costs):
+          edges.add(edge)
+    return edges
 
 
-  def _execute_gate(self, gate: Gate) -> "State":
+  def _execute_gates(self, costs: np.ndarray) -> "State":
     """
-      Executes a gate, returning the resulting state
+      Executes all gates, which can currently be executed, as well as all gates which
+      become executable by doing so, in a single step.
+      Returns the resulting state, whose output is the list of executed gates,
+      or None if no gate can be executed.
     """
-    working_set = self.working_set.copy()
-    working_set.remove(gate)
-    working_set.update(gate.children)
+    working_set = self.working_set
+    resolved_set = self.resolved_gates
+    used_qubits = self.used_qubits
+    checkpoint = self.checkpoint
+    cost = 0
+    output = []
 
-    resolved_set = self.resolved_gates.copy()
-    resolved_set.add(gate)
+    candidates = list(working_set)
+    while candidates:
+      gate = candidates.pop()
+      if gate in resolved_set or gate not in working_set:
+        continue
+      if not gate.can_be_executed(costs, self.mapping) or not gate.can_be_resolved(resolved_set):
+        continue
+
+      if not output:
+        # the sets are only copied, once a gate is actually executed
+        working_set = working_set.copy()
+        resolved_set = resolved_set.copy()
+        used_qubits = used_qubits.copy()
+
+      working_set.remove(gate)
+      working_set.update(gate.children)
+      resolved_set.add(gate)
+      candidates.extend(gate.children)
 
-    cost = self.cost + gate.cost()
-    remaining_cost = self.remaining_cost - gate.cost()
-    output = gate.to_logical(self.mapping)
+      cost += gate.cost()
+      gate_output = gate.to_logical(self.mapping)
+      output.append(gate_output)
 
-    used_qubits = self.used_qubits.copy()
-    if gate.type == Type.CNOT or gate.type == Type.SWAP:
-      # a gate only uses qubits if it is a cnot or a swap gate, all other gates
-      # (which use only 1 qubit), can be assigned other qubits
-      used_qubits.add(output.q1)
-      used_qubits.add(output.q2)
+      if gate.type == Type.CNOT or gate.type == Type.SWAP:
+        # a gate only uses qubits if it is a cnot or a swap gate, all other gates
+        # (which use only 1 qubit), can be assigned other qubits
+        used_qubits.add(gate_output.q1)
+        used_qubits.add(gate_output.q2)
 
-    checkpoint = self.checkpoint
-    if gate is self.checkpoint:
-      checkpoint = checkpoint.next
+      if gate is checkpoint:
+        checkpoint = checkpoint.next
+
+    if not output:
+      return None
+    return State(working_set, resolved_set, self.mapping, self.cost + cost, self.remaining_cost - cost, output, self, used_qubits, checkpoint)
 
-    return State(working_set, resolved_set, self.mapping, cost, remaining_cost, output, self, used_qubits, checkpoint)
 
-  
   def _generate_bridges(self, gate: Gate, neighbours: Dict[int, Set[int]]) -> Set["State"]:
     """
       Executes the current CNOT gate by applying a bride operation.
@@ -198,39 +330,30 @@ class State:
     return bridges
 
 
-  def _generate_swaps(self, qubit: int, neighbours: Dict[int, Set[int]]) -> Set["State"]:
+  def generate_swap(self, p: int, pn: int) -> "State":
     """
-      Generates swaps using the qubit provided.
-      In case the qubts, upon which the swaps operate, have not been used,
+      Generates the state resulting from swapping the physical qubits p and pn.
+      In case the qubts, upon which the swap operates, have not been used,
       this method just updates the mapping and does not emit a swap gate.
     """
-    swaps = set()
-    p, _ = self.mapping.logical_to_physical(qubit)
-    for pn in neighbours[p]:
-      ln, _ = self.mapping.physical_to_logical(pn)
-      mapping = self.mapping.swap(qubit, ln)
-      
-      working_set = self.working_set.copy()
-      resolved_set = self.resolved_gates.copy()
-      cost = self.cost + Type.SWAP.cost
+    l, ln = self.mapping.physical_to_logical(p, pn)
+    mapping = self.mapping.swap(l, ln)
 
-      if p in self.used_qubits or pn in self.used_qubits:
-        output = Gate(Type.SWAP, None, None, p, pn)
-        used_qubits = self.used_qubits.copy()
-        used_qubits.add(p)
-        used_qubits.add(pn)
-        swaps.add(
-          State(working_set, resolved_set, mapping, cost, self.remaining_cost, output, self, used_qubits, self.checkpoint)
-        )
-      else:
-        # we back propagate all changes later on
-        # we also do not add p and pn to the used gates, as we remove these swap gates later
-        output = Gate(Type.FREE_SWAP, None, None, p, pn)
-        swaps.add(
-          State(working_set, resolved_set, mapping, self.cost, self.remaining_cost, output, self, self.used_qubits, self.checkpoint)
-        )
-
-    return swaps
+    working_set = self.working_set.copy()
+    resolved_set = self.resolved_gates.copy()
+    cost = self.cost + Type.SWAP.cost
+
+    if p in self.used_qubits or pn in self.used_qubits:
+      output = Gate(Type.SWAP, None, None, p, pn)
+      used_qubits = self.used_qubits.copy()
+      used_qubits.add(p)
+      used_qubits.add(pn)
+      return State(working_set, resolved_set, mapping, cost, self.remaining_cost, output, self, used_qubits, self.checkpoint)
+
+    # we back propagate all changes later on
+    # we also do not add p and pn to the used gates, as we remove these swap gates later
+    output = Gate(Type.FREE_SWAP, None, None, p, pn)
+    return State(working_set, resolved_set, mapping, self.cost, self.remaining_cost, output, self, self.used_qubits, self.checkpoint)
 
 
   def __eq__(self, __o) -> bool:
@@ -254,6 +377,15 @@ class State:
     return self.checkpoint.depth > __o.checkpoint.depth
 
 
-      
-      
-
+def _lowers_distance(edge: Tuple[int, int], targets: Set[Tuple[int, int]], costs: np.ndarray) -> bool:
+  """
+    Returns true iff swapping the physical qubits of the edge lowers the distance
+    between the physical qubits of at least one of the targets.
+  """
+  p, pn = edge
+  for p1, p2 in targets:
+    s1 = pn if p1 == p else p if p1 == pn else p1
+    s2 = pn if p2 == p else p if p2 == pn else p2
+    if costs[s1, s2] < costs[p1, p2]:
+      return True
+  return False
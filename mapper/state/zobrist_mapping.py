@@ -0,0 +1,179 @@
+from array import array
+from typing import Dict, List, Tuple, Union
+
+
+_MASK = (1 << 64) - 1
+_keys: Dict[Tuple[int, int], int] = {} # (logical, physical) -> zobrist key, filled lazily
+
+
+class ZobristMapping:
+  """
+    Represents a mapping from physical to logical qubits, whose hash is the xor
+    of a (pseudo) random key for every logical -> physical pair (zobrist hashing).
+
+    A swapped mapping does not copy the qubit tables, but only stores the swap on top
+    of its parent and updates the hash with the keys of the 4 changed pairs, so
+    swapping and hashing are O(1). The tables are copied only once a mapping is
+    swapped itself, i.e. only for states which are actually expanded.
+  """
+  def __init__(self, qubit_count: int, logical_to_physical: array = None, physical_to_logical: array = None):
+    if logical_to_physical is None:
+      if physical_to_logical is not None:
+        raise ValueError("physical_to_logical has to be None if logical_to_physical is None")
+      logical_to_physical = array("i", range(qubit_count))
+      physical_to_logical = array("i", range(qubit_count))
+    elif physical_to_logical is None:
+      physical_to_logical = array("i", bytes(4 * qubit_count))
+      for l, p in enumerate(logical_to_physical):
+        physical_to_logical[p] = l
+
+    self._qubit_count = qubit_count
+    self._logical_to_physical = logical_to_physical
+    self._physical_to_logical = physical_to_logical
+    self._parent: ZobristMapping = None
+    self._swap: Tuple[int, int, int, int] = None
+
+    self._hash = 0
+    for l, p in enumerate(logical_to_physical):
+      self._hash ^= _key(l, p)
+
+
+  def swap(self, q1: int, q2: int) -> "ZobristMapping":
+    """
+      Swaps the logical qubits q1 and q2
+    """
+    self._materialize()
+    p1, p2 = self._logical_to_physical[q1], self._logical_to_physical[q2]
+
+    mapping = ZobristMapping.__new__(ZobristMapping)
+    mapping._qubit_count = self._qubit_count
+    mapping._logical_to_physical = None
+    mapping._physical_to_logical = None
+    mapping._parent = self
+    mapping._swap = (q1, q2, p1, p2)
+    mapping._hash = self._hash ^ _swap_key(q1, q2, p1, p2)
+    return mapping
+
+
+  def swap_inplace(self, q1: int, q2: int):
+    """
+      Performs a swap operation inplace
+    """
+    self._materialize()
+    ltp = self._logical_to_physical
+    ptl = self._physical_to_logical
+    p1, p2 = ltp[q1], ltp[q2]
+    ltp[q1], ltp[q2] = p2, p1
+    ptl[p1], ptl[p2] = q2, q1
+    self._hash ^= _swap_key(q1, q2, p1, p2)
+
+
+  def logical_to_physical(self, l1: int, l2: int = 0) -> Tuple[int, int]:
+    """
+      Maps the logical qubits l1 and l2 to their current physical mapping
+    """
+    return self._to_physical(l1), self._to_physical(l2)
+
+
+  def physical_to_logical(self, p1: int, p2: int = 0) -> Tuple[int, int]:
+    """
+      Maps the physical qubits p1 and p2 to their current logical mapping.
+      An inverse of ZobristMapping::logical_to_physical(...)
+    """
+    return self._to_logical(p1), self._to_logical(p2)
+
+
+  def _to_physical(self, l: Union[int, List[int]]) -> Union[int, List[int]]:
+    if isinstance(l, list): # used by barriers
+      return [self._to_physical(q) for q in l]
+    if self._logical_to_physical is not None:
+      return self._logical_to_physical[l]
+
+    q1, q2, p1, p2 = self._swap
+    if l == q1:
+      return p2
+    if l == q2:
+      return p1
+    return self._parent._logical_to_physical[l]
+
+
+  def _to_logical(self, p: Union[int, List[int]]) -> Union[int, List[int]]:
+    if isinstance(p, list):
+      return [self._to_logical(q) for q in p]
+    if self._physical_to_logical is not None:
+      return self._physical_to_logical[p]
+
+    q1, q2, p1, p2 = self._swap
+    if p == p1:
+      return q2
+    if p == p2:
+      return q1
+    return self._parent._physical_to_logical[p]
+
+
+  def _materialize(self):
+    """
+      Copies the tables of the parent and applies the swap on top of them.
+      Afterwards the parent is not needed anymore.
+    """
+    if self._logical_to_physical is not None:
+      return
+
+    q1, q2, p1, p2 = self._swap
+    ltp = self._parent._logical_to_physical[:]
+    ptl = self._parent._physical_to_logical[:]
+    ltp[q1], ltp[q2] = p2, p1
+    ptl[p1], ptl[p2] = q2, q1
+
+    self._logical_to_physical = ltp
+    self._physical_to_logical = ptl
+    self._parent = None
+    self._swap = None
+
+
+  def __eq__(self, __o: object) -> bool:
+    if __o is None or not isinstance(__o, ZobristMapping):
+      return False
+
+    if self._hash != __o._hash or self._qubit_count != __o._qubit_count:
+      return False
+
+    # only on a hash match the tables are compared
+    self._materialize()
+    __o._materialize()
+    return self._logical_to_physical == __o._logical_to_physical
+
+
+  def __hash__(self) -> int:
+    return self._hash
+
+
+  def __repr__(self) -> str:
+    repr = ""
+    for l in range(self._qubit_count):
+      p = self._to_physical(l)
+      if l != p:
+        repr += f"{l} -> {p}, "
+    return repr[:-2]
+
+
+def _key(l: int, p: int) -> int:
+  """
+    Returns the zobrist key of the pair logical qubit l -> physical qubit p.
+    The keys are derived using splitmix64, so no table of qubit_count^2 keys has to be stored,
+    only the keys of pairs which actually occur are cached.
+  """
+  key = _keys.get((l, p))
+  if key is None:
+    z = ((l << 32) ^ p ^ 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    key = _keys[(l, p)] = z ^ (z >> 31)
+  return key
+
+
+def _swap_key(q1: int, q2: int, p1: int, p2: int) -> int:
+  """
+    Returns the change of the hash when the logical qubits q1 (on p1) and q2 (on p2) are swapped.
+  """
+  return _key(q1, p1) ^ _key(q2, p2) ^ _key(q1, p2) ^ _key(q2, p1)
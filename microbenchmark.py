@@ -0,0 +1,245 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List, Tuple, Union
+
+from mapper.algorithms.astar import astar
+from mapper.algorithms.checkpoints import add_checkpoints
+from mapper.device import MAPPINGS, Device
+from mapper.gate.gate import Gate
+from mapper.qasm.input import get_coupling_map, read_gates
+from mapper.qasm.output import _backpropagate_free_swaps, _resolve_state, state_to_circuit
+from mapper.state.mapping import Mapping
+from mapper.state.state import State
+
+
+class Fixtures:
+  """
+    The fixed inputs of the benchmarks, derived from mapping a single circuit once.
+  """
+  def __init__(self, circuit_file: str, device: Device, checkpoint_offset: int, checkpoint_look_ahead: int):
+    self.circuit_file = circuit_file
+    self.device = device
+    self.checkpoint_offset = checkpoint_offset
+    self.checkpoint_look_ahead = checkpoint_look_ahead
+
+    working_set, gates, self.cregs = read_gates(circuit_file)
+    checkpoint = add_checkpoints(working_set, checkpoint_offset)
+    remaining_cost = sum(g.cost() for g in gates)
+    state = State({ checkpoint }, set(), device.create_mapping(), 0, remaining_cost, None, None, set(), checkpoint)
+    self.result = astar({ state }, device.costs, device.neighbours, checkpoint_look_ahead)
+
+    # states along the solution, which are used as representative states of the search
+    path = []
+    state = self.result
+    while state:
+      if state.working_set is not None and state.parent is not None and not state.is_done():
+        path.append(state)
+      state = state.parent
+    path.reverse()
+    step = max(1, len(path) // 20)
+    self.states = path[::step]
+    self.middle = path[len(path) // 2]
+    self.successors = list(self.middle.successors(device.costs, device.neighbours))
+
+    neighbours = device.neighbours
+    self.edges = [(p, pn) for p in sorted(neighbours) for pn in sorted(neighbours[p]) if p < pn]
+
+
+  def copy_result(self) -> State:
+    """
+      Copies the solution, as resolving it modifies the output gates inplace.
+    """
+    chain = []
+    state = self.result
+    while state:
+      chain.append(state)
+      state = state.parent
+
+    copy = None
+    for state in reversed(chain):
+      copy = State(None, None, state.mapping, state.cost, state.remaining_cost, _copy_gate(state.output), copy, None, state.checkpoint)
+    return copy
+
+
+def _copy_gate(gate: Union[Gate, List[Gate]]) -> Union[Gate, List[Gate]]:
+  if gate is None:
+    return None
+  if isinstance(gate, list):
+    return [_copy_gate(g) for g in gate]
+  return Gate(gate.type, None, None, gate.q1, gate.q2, gate.params)
+
+
+def _benchmarks(fixtures: Fixtures) -> Dict[str, Tuple[Callable, Callable, int]]:
+  """
+    Returns the benchmarks as name -> (function, setup, calls per sample).
+    The setup is executed before every sample and is not timed, its result is passed to the function.
+  """
+  device = fixtures.device
+  costs = device.costs
+  neighbours = device.neighbours
+  look_ahead = fixtures.checkpoint_look_ahead
+
+  def successors(_):
+    for state in fixtures.states:
+      state.successors(costs, neighbours)
+
+  def remaining_swaps(_):
+    for state in fixtures.successors:
+      state._remaining_swaps(costs, look_ahead)
+
+  def total_cost(_):
+    for state in fixtures.successors:
+      state.total_cost(costs, look_ahead)
+
+  def can_be_resolved(_):
+    resolved_gates = fixtures.middle.resolved_gates
+    for gate in fixtures.middle.working_set:
+      gate.can_be_resolved(resolved_gates)
+
+  benchmarks = {
+    "State.successors": (successors, None, 1),
+    "State._remaining_swaps": (remaining_swaps, None, 10),
+    "State.total_cost": (total_cost, None, 10),
+    "Gate.can_be_resolved": (can_be_resolved, None, 100),
+    "read_gates": (lambda _: read_gates(fixtures.circuit_file), None, 1),
+    "add_checkpoints": (
+      lambda working_set: add_checkpoints(working_set, fixtures.checkpoint_offset),
+      lambda: read_gates(fixtures.circuit_file)[0],
+      1
+    ),
+    "_backpropagate_free_swaps": (
+      lambda gates: _backpropagate_free_swaps(gates, device.qubit_count, Mapping(device.qubit_count)),
+      lambda: _resolve_state(fixtures.copy_result()),
+      1
+    ),
+    "state_to_circuit": (
+      lambda state: state_to_circuit(state, fixtures.cregs, Mapping(device.qubit_count)),
+      fixtures.copy_result,
+      1
+    ),
+  }
+
+  for name, mapping_class in MAPPINGS.items():
+    def swap(_, mapping=mapping_class(device.qubit_count)):
+      for p, pn in fixtures.edges:
+        mapping.swap(p, pn)
+
+    def swapped(mapping=mapping_class(device.qubit_count)):
+      return [mapping.swap(p, pn) for p, pn in fixtures.edges]
+
+    def hash_mappings(mappings):
+      for mapping in mappings:
+        hash(mapping)
+
+    benchmarks[f"{mapping_class.__name__}.swap"] = (swap, None, 10)
+    benchmarks[f"{mapping_class.__name__}.__hash__"] = (hash_mappings, swapped, 1)
+
+  return benchmarks
+
+
+def run(function: Callable, setup: Callable, calls: int, warmup: int, repeat: int) -> Dict[str, float]:
+  """
+    Runs a single benchmark, returning statistics over the time per call in seconds.
+  """
+  samples = []
+  for i in range(warmup + repeat):
+    argument = setup() if setup else None
+    start = time.perf_counter()
+    for _ in range(calls):
+      function(argument)
+    end = time.perf_counter()
+    if i >= warmup:
+      samples.append((end - start) / calls)
+
+  return {
+    "min": min(samples),
+    "mean": statistics.mean(samples),
+    "median": statistics.median(samples),
+    "stdev": statistics.stdev(samples) if len(samples) > 1 else 0,
+    "repeat": repeat,
+    "calls": calls,
+  }
+
+
+def _commit() -> str:
+  try:
+    return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def main(args: argparse.Namespace):
+  device = Device(get_coupling_map(), mapping=args.mapping)
+  fixtures = Fixtures(args.circuit, device, args.checkpoint_offset, args.checkpoint_look_ahead)
+  benchmarks = _benchmarks(fixtures)
+
+  selected = [name for name in benchmarks if not args.filter or any(f in name for f in args.filter)]
+  results = dict()
+  for name in selected:
+    function, setup, calls = benchmarks[name]
+    results[name] = run(function, setup, calls, args.warmup, args.repeat)
+    print(f"{name:<32} {_format(results[name]['median'])} (min {_format(results[name]['min'])}, stdev {_format(results[name]['stdev'])})")
+
+  if args.result:
+    with open(args.result, "w") as f:
+      json.dump({
+        "meta": {
+          "commit": _commit(),
+          "python": platform.python_version(),
+          "circuit": args.circuit,
+          "mapping": device.mapping,
+          "checkpoint_offset": args.checkpoint_offset,
+          "checkpoint_look_ahead": args.checkpoint_look_ahead,
+          "time": time.time(),
+        },
+        "results": results,
+      }, f, indent=2)
+
+  if args.compare:
+    compare(args.compare, results)
+
+
+def compare(baseline_file: str, results: Dict[str, Dict[str, float]]):
+  """
+    Prints the median of each benchmark relative to the one of the baseline result file.
+  """
+  with open(baseline_file) as f:
+    baseline = json.load(f)
+
+  print(f"\nCompared to {baseline_file} (commit {baseline['meta'].get('commit')}):")
+  for name, result in results.items():
+    if name not in baseline["results"]:
+      continue
+    ratio = result["median"] / baseline["results"][name]["median"]
+    print(f"{name:<32} {ratio:6.2f}x")
+
+
+def _format(seconds: float) -> str:
+  for unit, factor in [("s", 1), ("ms", 1e-3), ("us", 1e-6)]:
+    if seconds >= factor:
+      return f"{seconds / factor:8.3f}{unit}"
+  return f"{seconds / 1e-9:8.3f}ns"
+
+
+def setup_parser() -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--circuit", "-c", help="Circuit the inputs are derived from", default="samples/adder-8.qasm")
+  parser.add_argument("--result", "-r", help="Result json file name", default=None)
+  parser.add_argument("--compare", help="Result json file of an earlier run to compare to", default=None)
+  parser.add_argument("--filter", "-f", help="Only run benchmarks containing one of the given names", nargs="*", default=None)
+  parser.add_argument("--warmup", help="Amount of samples which are not measured", default=3, type=int)
+  parser.add_argument("--repeat", help="Amount of measured samples", default=20, type=int)
+  parser.add_argument("--mapping", help="Mapping implementation used for the search", default=None, choices=MAPPINGS.keys())
+  parser.add_argument("--checkpoint-offset", help="Offset of checkpoints", default=3, type=int)
+  parser.add_argument("--checkpoint-look-ahead", help="Amount of checkpoints to look ahead", default=2, type=int)
+  return parser
+
+
+if __name__ == "__main__":
+  parser = setup_parser()
+  args = parser.parse_args()
+  main(args)
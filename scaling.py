@@ -0,0 +1,106 @@
+import argparse
+import csv
+import os
+import time
+import tracemalloc
+from typing import Dict
+
+from mapper.device import MAPPINGS, Device
+from mapper.mapper import map_circuit
+from mapper.qasm.generator import GENERATORS, generate
+from mapper.qasm.input import get_coupling_map, parse_qasm
+
+
+FIELDS = ["kind", "qubits", "depth", "cnot_density", "seed", "gates", "cnots", "time", "peak_memory", "expansions", "cost", "swaps"]
+
+
+def main(args: argparse.Namespace):
+  device = Device(get_coupling_map(), mapping=args.mapping)
+  if args.circuits and not os.path.isdir(args.circuits):
+    os.mkdir(args.circuits)
+
+  rows = []
+  print(" ".join(f"{field:>12}" for field in FIELDS))
+  for kind in args.kinds:
+    for qubits in args.qubits:
+      if qubits > device.qubit_count:
+        print(f"Skipping {qubits} qubits, the device has only {device.qubit_count}")
+        continue
+      for depth in args.depths:
+        row = measure(device, kind, qubits, depth, args.cnot_density, args.seed, args)
+        rows.append(row)
+        print(" ".join(f"{_format(row[field]):>12}" for field in FIELDS))
+
+  with open(args.result, "w", newline="") as f:
+    writer = csv.DictWriter(f, FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def measure(device: Device, kind: str, qubits: int, depth: int, cnot_density: float, seed: int, args: argparse.Namespace) -> Dict:
+  """
+    Generates and maps a single circuit, measuring time, peak memory (of the mapping, excluding the parsing)
+    and the amount of expanded states.
+    The circuit is parsed once and mapped twice, as tracing the memory slows down the mapping considerably:
+    the time is measured in the first run, the peak memory in the second one.
+  """
+  qasm = generate(kind, qubits, depth, cnot_density, seed)
+  if args.circuits:
+    with open(os.path.join(args.circuits, f"{kind}-{qubits}-{depth}.qasm"), "w") as f:
+      f.write(qasm)
+
+  lines = qasm.splitlines()
+  circuit = parse_qasm(qasm)
+  parameters = (args.checkpoint_offset, args.checkpoint_look_ahead, args.prune_look_ahead)
+
+  start = time.perf_counter()
+  _, info = map_circuit(circuit, device, *parameters)
+  end = time.perf_counter()
+
+  tracemalloc.start()
+  map_circuit(circuit, device, *parameters)
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  return {
+    "kind": kind,
+    "qubits": qubits,
+    "depth": depth,
+    "cnot_density": cnot_density,
+    "seed": seed,
+    "gates": sum(1 for line in lines if line.startswith(("cx", "rz", "sx", "x ", "measure"))),
+    "cnots": sum(1 for line in lines if line.startswith("cx")),
+    "time": end - start,
+    "peak_memory": peak,
+    "expansions": info.stats.expansions,
+    "cost": info.cost,
+    "swaps": info.swaps,
+  }
+
+
+def _format(value) -> str:
+  if isinstance(value, float):
+    return f"{value:.3f}"
+  return str(value)
+
+
+def setup_parser() -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--kinds", "-k", help="Kinds of circuits to generate", nargs="+", default=list(GENERATORS.keys()), choices=GENERATORS.keys())
+  parser.add_argument("--qubits", "-q", help="Qubit counts to generate", nargs="+", default=[5, 10, 20, 40, 65], type=int)
+  parser.add_argument("--depths", "-d", help="Depths (layers or repeated blocks) to generate", nargs="+", default=[5, 10, 20], type=int)
+  parser.add_argument("--cnot-density", help="Probability of each possible cnot of a layer", default=0.5, type=float)
+  parser.add_argument("--seed", "-s", help="Seed of the generated circuits", default=0, type=int)
+  parser.add_argument("--circuits", help="Folder to store the generated circuits in", default=None)
+  parser.add_argument("--result", "-r", help="Result csv file name", default="scaling.csv")
+  parser.add_argument("--mapping", help="Mapping implementation used for the search", default=None, choices=MAPPINGS.keys())
+  parser.add_argument("--checkpoint-offset", help="Offset of checkpoints", default=3, type=int)
+  parser.add_argument("--checkpoint-look-ahead", help="Amount of checkpoints to look ahead", default=2, type=int)
+  parser.add_argument("--prune-look-ahead", help="Only generate swaps relevant to the front layer and the given amount of checkpoints", default=None, type=int)
+  return parser
+
+
+if __name__ == "__main__":
+  parser = setup_parser()
+  args = parser.parse_args()
+  main(args)